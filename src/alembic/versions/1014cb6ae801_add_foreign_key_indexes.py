@@ -0,0 +1,39 @@
+"""add foreign key indexes
+
+Revision ID: 1014cb6ae801
+Revises: 1450a8a91b80
+Create Date: 2026-10-18 17:47:36.889933
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1014cb6ae801'
+down_revision: Union[str, Sequence[str], None] = '1450a8a91b80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FK 컬럼 인덱스. posts.user_id 는 ix_posts_user_id_created_at, comments.post_id 는 ix_comments_post_id_id,
+    # comments.parent_id 는 ix_comments_parent_id_id 가 앞 컬럼으로 이미 덮는다. 남은 것은 comments.user_id 뿐이다.
+    # (MySQL 이 FK 를 위해 자동으로 만든 인덱스는 이 인덱스가 생기면 알아서 지워진다)
+    op.create_index('ix_comments_user_id_post_id', 'comments', ['user_id', 'post_id'])
+
+    # 기본 키와 같은 컬럼의 중복 인덱스는 쓰기 비용만 늘린다
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_index('ix_posts_id', table_name='posts')
+    op.drop_index('ix_comments_id', table_name='comments')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_comments_id', 'comments', ['id'])
+    op.create_index('ix_posts_id', 'posts', ['id'])
+    op.create_index('ix_users_id', 'users', ['id'])
+    op.drop_index('ix_comments_user_id_post_id', table_name='comments')
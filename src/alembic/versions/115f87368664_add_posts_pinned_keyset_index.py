@@ -0,0 +1,44 @@
+"""add posts pinned keyset index
+
+Revision ID: 115f87368664
+Revises: 587ddc1d3d17
+Create Date: 2026-10-18 17:12:05.731142
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '115f87368664'
+down_revision: Union[str, Sequence[str], None] = '587ddc1d3d17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL 은 (is_pinned DESC, id DESC) 키셋 비교를 깨뜨리므로 먼저 채워 넣는다
+    op.execute("UPDATE posts SET is_pinned = 0 WHERE is_pinned IS NULL")
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column(
+            'is_pinned',
+            existing_type=sa.Boolean(),
+            nullable=False,
+            server_default=sa.false(),
+        )
+    op.create_index('ix_posts_is_pinned_id', 'posts', ['is_pinned', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_posts_is_pinned_id', table_name='posts')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column(
+            'is_pinned',
+            existing_type=sa.Boolean(),
+            nullable=True,
+            server_default=None,
+        )
@@ -0,0 +1,38 @@
+"""add posts created_at indexes
+
+Revision ID: 1450a8a91b80
+Revises: 831eeb0a5930
+Create Date: 2026-10-18 17:45:57.565026
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1450a8a91b80'
+down_revision: Union[str, Sequence[str], None] = '831eeb0a5930'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 예전 default 는 import 시각 하나로 고정돼 있었다. 실제 작성 시각은 되살릴 수 없으므로 비어 있는 값만 채운다
+    op.execute("UPDATE posts SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL")
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.alter_column(
+            'created_at', existing_type=sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp(),
+        )
+        batch_op.create_index('ix_posts_created_at', ['created_at'])
+        batch_op.create_index('ix_posts_user_id_created_at', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_index('ix_posts_user_id_created_at')
+        batch_op.drop_index('ix_posts_created_at')
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True, server_default=None)
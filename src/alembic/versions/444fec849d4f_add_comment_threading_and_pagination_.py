@@ -0,0 +1,38 @@
+"""add comment threading and pagination indexes
+
+Revision ID: 444fec849d4f
+Revises: a2dbb735d591
+Create Date: 2026-10-18 17:34:29.189619
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '444fec849d4f'
+down_revision: Union[str, Sequence[str], None] = 'a2dbb735d591'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.add_column(sa.Column('parent_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_comments_parent_id_comments', 'comments', ['parent_id'], ['id'], ondelete='CASCADE',
+        )
+        batch_op.create_index('ix_comments_post_id_id', ['post_id', 'id'])
+        batch_op.create_index('ix_comments_parent_id_id', ['parent_id', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.drop_index('ix_comments_parent_id_id')
+        batch_op.drop_index('ix_comments_post_id_id')
+        batch_op.drop_constraint('fk_comments_parent_id_comments', type_='foreignkey')
+        batch_op.drop_column('parent_id')
@@ -0,0 +1,41 @@
+"""add posts fulltext index
+
+Revision ID: 9e56e9167a14
+Revises: bbb5b67bfb29
+Create Date: 2026-10-18 17:21:13.891348
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e56e9167a14'
+down_revision: Union[str, Sequence[str], None] = 'bbb5b67bfb29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FULLTEXT 는 MySQL 전용. 다른 DB 에서는 애플리케이션의 역색인으로 대신한다
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    # 한국어는 공백 단위 토큰화가 맞지 않으므로 ngram 파서를 사용한다
+    op.create_index(
+        'ft_posts_title_content',
+        'posts',
+        ['title', 'content'],
+        unique=False,
+        mysql_prefix='FULLTEXT',
+        mysql_with_parser='ngram',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ft_posts_title_content', table_name='posts')
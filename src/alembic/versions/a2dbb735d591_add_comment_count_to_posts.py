@@ -0,0 +1,36 @@
+"""add comment_count to posts
+
+Revision ID: a2dbb735d591
+Revises: 9e56e9167a14
+Create Date: 2026-10-18 17:22:16.650601
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2dbb735d591'
+down_revision: Union[str, Sequence[str], None] = '9e56e9167a14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'posts',
+        sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'),
+    )
+    # 기존 글의 댓글 수를 한 번에 채운다
+    op.execute(
+        "UPDATE posts SET comment_count = "
+        "(SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('posts', 'comment_count')
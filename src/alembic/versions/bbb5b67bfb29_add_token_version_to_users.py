@@ -0,0 +1,31 @@
+"""add token_version to users
+
+Revision ID: bbb5b67bfb29
+Revises: ea0fee43064d
+Create Date: 2026-10-18 17:19:06.464970
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'bbb5b67bfb29'
+down_revision: Union[str, Sequence[str], None] = 'ea0fee43064d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'users',
+        sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'token_version')
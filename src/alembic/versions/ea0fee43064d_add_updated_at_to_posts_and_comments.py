@@ -0,0 +1,42 @@
+"""add updated_at to posts and comments
+
+Revision ID: ea0fee43064d
+Revises: 115f87368664
+Create Date: 2026-10-18 17:17:48.018415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ea0fee43064d'
+down_revision: Union[str, Sequence[str], None] = '115f87368664'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TIMESTAMP_TYPE = sa.DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', TIMESTAMP_TYPE, nullable=True))
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.add_column(sa.Column('updated_at', TIMESTAMP_TYPE, nullable=True))
+
+    # 기존 행은 작성 시각(없으면 마이그레이션 시각)을 마지막 수정 시각으로 삼는다
+    op.execute("UPDATE posts SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)")
+    op.execute("UPDATE comments SET updated_at = CURRENT_TIMESTAMP")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('comments') as batch_op:
+        batch_op.drop_column('updated_at')
+    with op.batch_alter_table('posts') as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,77 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from database.repository import PostRepository, CommentRepository, UserRepository
+from schema.request import BulkIdsRequest, BulkPinRequest, BulkReassignRequest
+from schema.response import BulkResultResponse
+from service.security import require_admin
+
+
+# 스팸 정리 등 여러 글/댓글을 한 번에 처리한다. 요청 하나가 트랜잭션 하나다
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+
+async def _ensure_user_exists(user_repo: UserRepository, user_id: int):
+    if await user_repo.get_user_by_id(user_id) is None:
+        raise HTTPException(status_code=404, detail="User Not Found")
+
+
+@router.patch("/posts/pin", response_model=BulkResultResponse)
+async def pin_posts(
+        data: BulkPinRequest,
+        post_repo: Annotated[PostRepository, Depends()],
+):
+    return BulkResultResponse(affected=await post_repo.pin_posts(data.ids, data.is_pinned))
+
+
+@router.patch("/posts/author", response_model=BulkResultResponse)
+async def reassign_posts(
+        data: BulkReassignRequest,
+        post_repo: Annotated[PostRepository, Depends()],
+        user_repo: Annotated[UserRepository, Depends()],
+):
+    await _ensure_user_exists(user_repo, data.user_id)
+    return BulkResultResponse(affected=await post_repo.reassign_posts(data.ids, data.user_id))
+
+
+@router.post("/posts/delete", response_model=BulkResultResponse)
+async def delete_posts(
+        data: BulkIdsRequest,
+        post_repo: Annotated[PostRepository, Depends()],
+):
+    return BulkResultResponse(affected=await post_repo.delete_posts(data.ids))
+
+
+@router.patch("/comments/author", response_model=BulkResultResponse)
+async def reassign_comments(
+        data: BulkReassignRequest,
+        comment_repo: Annotated[CommentRepository, Depends()],
+        user_repo: Annotated[UserRepository, Depends()],
+):
+    await _ensure_user_exists(user_repo, data.user_id)
+    return BulkResultResponse(affected=await comment_repo.reassign_comments(data.ids, data.user_id))
+
+
+@router.post("/comments/delete", response_model=BulkResultResponse)
+async def delete_comments(
+        data: BulkIdsRequest,
+        comment_repo: Annotated[CommentRepository, Depends()],
+):
+    return BulkResultResponse(affected=await comment_repo.delete_comments(data.ids))
+
+
+@router.delete("/users/{user_id}/posts", response_model=BulkResultResponse)
+async def delete_posts_by_user(
+        user_id: int,
+        post_repo: Annotated[PostRepository, Depends()],
+):
+    return BulkResultResponse(affected=await post_repo.delete_posts_by_user(user_id))
+
+
+@router.delete("/users/{user_id}/comments", response_model=BulkResultResponse)
+async def delete_comments_by_user(
+        user_id: int,
+        comment_repo: Annotated[CommentRepository, Depends()],
+):
+    return BulkResultResponse(affected=await comment_repo.delete_comments_by_user(user_id))
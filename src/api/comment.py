@@ -1,44 +1,49 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
 
-from database.orm import User, Comment
-from database.repository import CommentRepository, PostRepository
+from database.orm import Comment
+from database.repository import CommentRepository
 from schema.request import CreateCommentRequest
-from schema.response import CommentResponse
-from service.security import get_current_user
+from schema.response import CommentResponse, CommentPageResponse
+from service.http_cache import make_etag, not_modified_response
+from service.jobs import JOB_QUERIES
+from service.json_response import json_response
+from service.metrics import query_budget
+from service.pagination import decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from service.security import get_current_user, CurrentUser
+from settings import settings
+
+# 버전 확인 1 + 최상위 페이지 1 + 답글 깊이마다 1 + 마지막 깊이의 답글 수 1
+COMMENT_PAGE_QUERIES = 3 + settings.COMMENT_REPLY_DEPTH
 
 router = APIRouter(prefix="/comment")
 
-@router.post("/{post_id}", response_model=CommentResponse, status_code=201)
+@router.post("/{post_id}", response_model=CommentResponse, status_code=201, dependencies=[Depends(query_budget(4 + JOB_QUERIES))])
 async def create_comment(
         post_id: int,
         comment_data: CreateCommentRequest,
-        post_repo: Annotated[PostRepository, Depends()],
         comment_repo: Annotated[CommentRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)]
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
-
-    post = await post_repo.get_post_by_id(post_id)
-    if post is None:
-        raise HTTPException(status_code=404, detail="Post Not Found")
-
+    # 글 존재 여부는 create_comment 의 댓글 수 UPDATE 로 함께 확인한다
     comment = Comment.create(
         post_id=post_id,
         content=comment_data.content,
         user_id=current_user.id,
+        parent_id=comment_data.parent_id,
     )
     comment = await comment_repo.create_comment(comment)
 
-    return CommentResponse.from_orm(comment)
+    return CommentResponse.from_orm(comment, username=current_user.username)
 
 
-@router.put("/{comment_id}", response_model=CommentResponse)
+@router.put("/{comment_id}", response_model=CommentResponse, dependencies=[Depends(query_budget(3 + JOB_QUERIES))])
 async def update_comment(
         comment_id: int,
         comment_data: CreateCommentRequest,
         comment_repo: Annotated[CommentRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)]
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
     comment = await comment_repo.get_comment_by_comment_id(comment_id)
     if comment is None:
@@ -52,11 +57,11 @@ async def update_comment(
     return CommentResponse.from_orm(comment)
 
 
-@router.delete("/{comment_id}", status_code=204)
+@router.delete("/{comment_id}", status_code=204, dependencies=[Depends(query_budget(4 + JOB_QUERIES))])
 async def delete_comment(
         comment_id: int,
         comment_repo: Annotated[CommentRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)]
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
 
     comment = await comment_repo.get_comment_by_comment_id(comment_id)
@@ -70,10 +75,44 @@ async def delete_comment(
     return {"message": "Comment deleted successfully"}
 
 
-@router.get("/post/{post_id}", response_model=list[CommentResponse])
+@router.get("/post/{post_id}", response_model=CommentPageResponse, dependencies=[Depends(query_budget(COMMENT_PAGE_QUERIES))])
 async def get_comments_by_post(
+        request: Request,
+        response: Response,
         post_id: int,
-        comment_repo: Annotated[CommentRepository, Depends()]
+        comment_repo: Annotated[CommentRepository, Depends()],
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
 ):
-    comments = await comment_repo.get_comments_by_post_id(post_id)
-    return [CommentResponse.from_orm(c) for c in comments]
\ No newline at end of file
+    after = decode_cursor(cursor, int)[0] if cursor else None
+
+    version = await comment_repo.get_comments_version(post_id)
+    etag = make_etag("comments", post_id, after, limit, version)
+    if (not_modified := not_modified_response(request, response, etag)) is not None:
+        return not_modified
+
+    return json_response(await comment_repo.get_cached_comments(post_id, after, limit, etag), response)
+
+
+@router.get("/{comment_id}/replies", response_model=CommentPageResponse, dependencies=[Depends(query_budget(COMMENT_PAGE_QUERIES + 1))])
+async def get_replies(
+        request: Request,
+        response: Response,
+        comment_id: int,
+        comment_repo: Annotated[CommentRepository, Depends()],
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    # 댓글 목록에서 깊이 제한이나 미리보기 개수에 걸려 잘린 답글을 이어서 읽는다
+    after = decode_cursor(cursor, int)[0] if cursor else None
+
+    post_id = await comment_repo.get_comment_post_id(comment_id)
+    if post_id is None:
+        raise HTTPException(status_code=404, detail="Comment Not Found")
+
+    version = await comment_repo.get_comments_version(post_id)
+    etag = make_etag("replies", comment_id, after, limit, version)
+    if (not_modified := not_modified_response(request, response, etag)) is not None:
+        return not_modified
+
+    return json_response(await comment_repo.get_cached_replies(post_id, comment_id, after, limit, etag), response)
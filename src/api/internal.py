@@ -0,0 +1,39 @@
+import secrets
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from database.connection import pool_status
+from service.jobs import jobs
+from service.metrics import registry
+from settings import settings
+
+
+def require_internal_access(x_internal_token: Annotated[str | None, Header()] = None):
+    if settings.INTERNAL_TOKEN:
+        if x_internal_token is None or not secrets.compare_digest(x_internal_token, settings.INTERNAL_TOKEN):
+            raise HTTPException(status_code=403, detail="Forbidden")
+    elif settings.ENV == "prod":
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
+router = APIRouter(prefix="/internal", dependencies=[Depends(require_internal_access)])
+# Prometheus 기본 스크레이프 경로에 맞춰 /metrics 에 둔다
+metrics_router = APIRouter(dependencies=[Depends(require_internal_access)])
+
+
+@router.get("/db-pool")
+async def get_db_pool_status():
+    return pool_status()
+
+
+@router.get("/jobs")
+async def get_job_queue_status():
+    return jobs.stats()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    # Prometheus 스크레이프용 텍스트 형식
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,50 +1,144 @@
 import os
 import uuid
+from datetime import datetime, timezone
 from typing import Annotated
 
-import cloudinary
-import cloudinary.uploader  # ✅ 이 줄이 필요함!
-from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Request
+from fastapi import APIRouter, Depends, HTTPException, Body, UploadFile, File, Request, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import get_db
-from database.orm import User, Post
+from database.orm import Post
 from database.repository import PostRepository
 from schema.request import CreatePostRequest
-from schema.response import PostResponse
+from schema.response import PostResponse, PostPageResponse, PostSummaryResponse, PostSummaryPageResponse, PostSearchResult, PostSearchPageResponse, EXCERPT_LENGTH
 from service.file import upload_file
-from service.security import get_current_user
+from service.http_cache import make_etag, not_modified_response
+from service.jobs import JOB_QUERIES
+from service.json_response import json_response
+from service.metrics import query_budget
+from service.pagination import encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from service.search import query_terms
+from service.security import get_current_user, require_admin, CurrentUser
 
 router = APIRouter(prefix="/posts")
 
 
-@router.get("/", response_model=list[PostResponse])
+@router.get("/", response_model=PostPageResponse, dependencies=[Depends(query_budget(3))])
 async def get_all_posts(
-        post_repo: Annotated[PostRepository, Depends()]
+        request: Request,
+        response: Response,
+        post_repo: Annotated[PostRepository, Depends()],
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    after = decode_cursor(cursor, bool, int) if cursor else None
+
+    # 목록은 삭제돼도 최신 수정 시각이 줄지 않으므로 ETag 로만 검증한다
+    version = await post_repo.get_posts_version(after, limit)
+    etag = make_etag("posts", after, limit, version)
+    if (not_modified := not_modified_response(request, response, etag)) is not None:
+        return not_modified
+
+    # 본문은 ETag 를 만든 버전으로 캐시된 것만 쓴다 (버전이 다르면 지금 다시 읽는다)
+    return json_response(await post_repo.get_cached_posts(after, limit, etag), response)
+
+
+@router.get("/summary", response_model=PostSummaryPageResponse, dependencies=[Depends(query_budget(1))])
+async def get_post_summaries(
+        post_repo: Annotated[PostRepository, Depends()],
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    after = decode_cursor(cursor, bool, int) if cursor else None
+    return json_response(await post_repo.get_cached_post_summaries(after, limit, excerpt_length=EXCERPT_LENGTH))
+
+
+@router.get("/search", response_model=PostSearchPageResponse)
+async def search_posts(
+        post_repo: Annotated[PostRepository, Depends()],
+        q: Annotated[str, Query(min_length=1, max_length=100)],
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    # 관련도 순 정렬이라 키셋 대신 오프셋을 커서에 담는다
+    offset = decode_cursor(cursor, int)[0] if cursor else 0
+    rows, has_more = await post_repo.search_posts(q, offset, limit)
+    terms = query_terms(q)
+    return PostSearchPageResponse(
+        posts=[PostSearchResult.from_row(row, terms) for row in rows],
+        next_cursor=encode_cursor(offset + limit) if has_more else None,
+    )
+
+
+def _as_utc(value: datetime | None) -> datetime | None:
+    # DB 는 UTC 를 시간대 없이 저장한다. 시간대가 붙어 오면 UTC 로 바꾸고, 없으면 UTC 로 본다
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+async def _time_page(post_repo: PostRepository, since, until, user_id, cursor, limit) -> dict:
+    after = None
+    if cursor:
+        created_at, post_id = decode_cursor(cursor, str, int)
+        try:
+            after = (datetime.fromisoformat(created_at), post_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    rows, next_key = await post_repo.get_posts_by_time(
+        _as_utc(since), _as_utc(until), user_id, after, limit, excerpt_length=EXCERPT_LENGTH,
+    )
+    return {
+        "posts": [PostSummaryResponse.dict_from_row(row) for row in rows],
+        "next_cursor": encode_cursor(next_key[0].isoformat(), next_key[1]) if next_key else None,
+    }
+
+
+@router.get("/archive", response_model=PostSummaryPageResponse, dependencies=[Depends(query_budget(1))])
+async def get_post_archive(
+        post_repo: Annotated[PostRepository, Depends()],
+        since: Annotated[datetime | None, Query(description="이 시각 이후 (포함)")] = None,
+        until: Annotated[datetime | None, Query(description="이 시각 이전 (제외)")] = None,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
 ):
-    result = await post_repo.get_posts()
-    return [PostResponse.from_orm(post) for post in result]
+    # 기간별 보관함: 공지 고정 없이 작성 시각 최신순
+    return json_response(await _time_page(post_repo, since, until, None, cursor, limit))
 
 
-@router.post("/", response_model=PostResponse)
+@router.get("/users/{user_id}", response_model=PostSummaryPageResponse, dependencies=[Depends(query_budget(1))])
+async def get_posts_by_user(
+        user_id: int,
+        post_repo: Annotated[PostRepository, Depends()],
+        since: Annotated[datetime | None, Query(description="이 시각 이후 (포함)")] = None,
+        until: Annotated[datetime | None, Query(description="이 시각 이전 (제외)")] = None,
+        cursor: str | None = None,
+        limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    # 프로필 화면: 한 작성자의 글을 작성 시각 최신순
+    return json_response(await _time_page(post_repo, since, until, user_id, cursor, limit))
+
+
+@router.post("/", response_model=PostResponse, dependencies=[Depends(query_budget(2 + JOB_QUERIES))])
 async def create_post(
         post_data: CreatePostRequest,
         post_repo: Annotated[PostRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)]
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
     post = Post.create(post_data, user_id=current_user.id)
 
     post = await post_repo.create_post(post)
 
-    return PostResponse.from_orm(post)
+    return PostResponse.from_orm(post, username=current_user.username)
 
 
-@router.put("/{post_id}", response_model=PostResponse)
+@router.put("/{post_id}", response_model=PostResponse, dependencies=[Depends(query_budget(3 + JOB_QUERIES))])
 async def update_post(
         post_id:int,
         post_data: CreatePostRequest,
         post_repo: Annotated[PostRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)],
+        current_user: Annotated[CurrentUser, Depends(get_current_user)],
 ):
     existing_post = await post_repo.get_post_by_id(post_id)
     if not existing_post:
@@ -53,15 +147,15 @@ async def update_post(
     if existing_post.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not Authorized")
 
-    updated_post = await post_repo.update_post(post_id, post_data)
+    updated_post = await post_repo.update_post(existing_post, post_data)
     return PostResponse.from_orm(updated_post)
 
 
-@router.delete("/{post_id}", status_code=204)
+@router.delete("/{post_id}", status_code=204, dependencies=[Depends(query_budget(3 + JOB_QUERIES))])
 async def delete_post(
         post_id: int,
         post_repo: Annotated[PostRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)]
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
 ):
     post = await post_repo.get_post_by_id(post_id)
     if post is None:
@@ -69,32 +163,40 @@ async def delete_post(
     if current_user.id != post.user_id:
         raise HTTPException(status_code=403, detail="Not Authorized")
 
-    await post_repo.delete_post(post_id)
+    await post_repo.delete_post(post)
 
     return {"message": "Post deleted successfully"}
 
 
-@router.get("/{post_id}", response_model=PostResponse)
+@router.get("/{post_id}", response_model=PostResponse, dependencies=[Depends(query_budget(3))])
 async def get_post_by_id(
+        request: Request,
+        response: Response,
         post_id: int,
         post_repo: Annotated[PostRepository,Depends()]
 ):
-    post = await post_repo.get_post_by_id(post_id)
+    version = await post_repo.get_post_version(post_id)
+    if version is None:
+        raise HTTPException(status_code=404, detail="Post Not Found")
+
+    etag = make_etag("post", post_id, version.updated_at)
+    if (not_modified := not_modified_response(request, response, etag, version.updated_at)) is not None:
+        return not_modified
+
+    post = await post_repo.get_cached_post(post_id, etag)
     if not post:
         raise HTTPException(status_code=404, detail="Post Not Found")
-    return PostResponse.from_orm(post)
+    return json_response(post, response)
 
 
-@router.patch("/{post_id}/pin")
+# 권한 재확인 1 + 글/작성자 2 + UPDATE 1
+@router.patch("/{post_id}/pin", dependencies=[Depends(query_budget(4 + JOB_QUERIES))])
 async def pin_post(
         post_id: int,
         is_pinned: Annotated[bool, Body(..., embed=True)],
         post_repo: Annotated[PostRepository, Depends()],
-        current_user: Annotated[User, Depends(get_current_user)],
+        current_user: Annotated[CurrentUser, Depends(require_admin)],
 ):
-    if not current_user.admin:
-        raise HTTPException(status_code=403, detail="관리자만 공지글을 설정할 수 있습니다.")
-
     post = await post_repo.get_post_by_id(post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post Not Found")
@@ -111,12 +213,5 @@ async def pin_post(
 async def upload_image(
     file: Annotated[UploadFile, File(...)]
 ):
-    try:
-        result = cloudinary.uploader.upload(file.file)
-        # ✅ Cloudinary에서 제공하는 절대 URL만 그대로 반환
-        return {"url": result["secure_url"]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Cloudinary 업로드 실패")
-
-
-
+    # 저장소(Cloudinary/로컬/메모리)는 settings.STORAGE_BACKEND 로 선택
+    return await upload_file(file)
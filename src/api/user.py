@@ -9,7 +9,7 @@ from database.orm import User
 from database.repository import UserRepository
 from schema.request import SignUpRequest, SignInRequest
 from schema.response import SignUpResponse, SignInResponse
-from service.security import create_JWT
+from service.security import create_JWT, get_current_user, revoke_tokens, CurrentUser
 from service.user import SignUpService, SignInService
 
 router = APIRouter(prefix="/user")
@@ -26,7 +26,7 @@ async def user_sign_up(
     # username이 중복인지 확인
     if await user_service.check_duplicated_username(request.username, user_repo):
         raise HTTPException(status_code=400, detail="이미 해당 id가 존재합니다.")
-    hashed_password = user_service.hash_password(request.password)
+    hashed_password = await user_service.hash_password(request.password)
 
     user = User.create(
         username=request.username,
@@ -46,8 +46,18 @@ async def user_sign_in(
 ):
     user_repo = UserRepository(db)
     user = await user_repo.get_user_by_username(request.username)
-    if (user is None) or (not user_service.verify_password(request.password, user.hashed_password)):
+    if (user is None) or (not await user_service.verify_password(request.password, user.hashed_password)):
         raise HTTPException(status_code=401, detail="Not Authorized")
+    await user_service.rehash_if_needed(user, request.password, user_repo)
 
-    token = create_JWT(request.username, user.admin)
+    token = create_JWT(request.username, user.admin, user.id, user.token_version)
     return SignInResponse(token=token)
+
+
+@router.post("/sign-out-all", status_code=204)
+async def user_sign_out_all(
+        db: Annotated[AsyncSession, Depends(get_db)],
+        current_user: Annotated[CurrentUser, Depends(get_current_user)]
+):
+    # 지금까지 발급된 이 사용자의 토큰을 모두 폐기
+    await revoke_tokens(current_user.id, UserRepository(db))
@@ -0,0 +1,59 @@
+"""두 벤치마크 리포트(JSON)를 비교한다.
+
+    cd src && python -m benchmarks.compare before.json after.json [--threshold 10]
+
+p95 가 threshold(%) 이상 느려진 항목이 있으면 종료 코드 1 을 돌려준다.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_per_s")
+
+
+def _change(before: float, after: float) -> float | None:
+    if not before:
+        return None
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"baseline {baseline['environment'].get('git_commit')} → current {current['environment'].get('git_commit')}")
+    print(f"{'name':<32}" + "".join(f"{metric:>24}" for metric in METRICS))
+    for name, after in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            print(f"{name:<32}  (baseline 에 없음)")
+            continue
+        cells = []
+        for metric in METRICS:
+            change = _change(before[metric], after[metric])
+            text = f"{before[metric]:.2f}→{after[metric]:.2f}"
+            if change is not None:
+                text += f" ({change:+.0f}%)"
+            cells.append(f"{text:>24}")
+        print(f"{name:<32}" + "".join(cells))
+
+        change = _change(before["p95_ms"], after["p95_ms"])
+        if change is not None and change > threshold:
+            regressions.append(f"{name}: p95 {change:+.1f}%")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10, help="p95 회귀로 볼 변화율(%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="UTF-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="UTF-8") as f:
+        current = json.load(f)
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print("\n회귀:", *regressions, sep="\n  ")
+        sys.exit(1)
@@ -0,0 +1,160 @@
+"""엔드투엔드 부하 시나리오: 피드, 글 상세, 댓글 목록, 로그인, 글/댓글 작성.
+
+    cd src && python -m benchmarks.load --duration 20 --concurrency 32 --output load.json
+    cd src && python -m benchmarks.load --base-url http://127.0.0.1:8000 --scenarios feed post_detail
+
+--base-url 이 없으면 같은 프로세스에서 앱을 ASGI 로 직접 호출한다 (네트워크/uvicorn 비용 제외, 요청 한도 끔).
+--base-url 로 잴 때는 서버를 RATE_LIMIT_ENABLED=false 로 띄워야 로그인 등이 429 로 끊기지 않는다.
+로그인/작성 시나리오는 benchmarks.seed 가 만든 {prefix}_{번호} 사용자를 쓴다.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.report import summarize, build_report, write_report
+from benchmarks.seed import BENCH_PASSWORD, sentence
+from settings import settings
+
+SCENARIOS = ("feed", "post_detail", "comments", "sign_in", "create")
+
+
+class LoadContext:
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, prefix: str, users: int):
+        self.client = client
+        self.rng = rng
+        self.prefix = prefix
+        self.users = users
+        self.post_ids: list[int] = []
+        self.tokens: list[str] = []
+
+    def username(self) -> str:
+        return f"{self.prefix}_{self.rng.randrange(self.users)}"
+
+    async def sign_in(self, username: str) -> httpx.Response:
+        return await self.client.post("/user/sign-in", json={"username": username, "password": BENCH_PASSWORD})
+
+    async def prepare(self, token_count: int, pages: int):
+        # 상세/댓글 시나리오에 쓸 글 id 를 피드에서 모은다 (원격 서버면 DB 에 직접 접근할 수 없으므로)
+        cursor = None
+        for _ in range(pages):
+            response = await self.client.get("/posts/", params={"cursor": cursor} if cursor else None)
+            response.raise_for_status()
+            page = response.json()
+            self.post_ids.extend(post["id"] for post in page["posts"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        if not self.post_ids:
+            raise SystemExit("글이 없습니다. python -m benchmarks.seed 를 먼저 실행하세요.")
+
+        for i in range(token_count):
+            response = await self.sign_in(f"{self.prefix}_{i % self.users}")
+            response.raise_for_status()
+            self.tokens.append(response.json()["token"])
+
+
+async def feed(ctx: LoadContext) -> list[httpx.Response]:
+    # 첫 페이지와 그다음 페이지까지 (무한 스크롤 한 번)
+    first = await ctx.client.get("/posts/")
+    responses = [first]
+    if first.status_code == 200 and first.json()["next_cursor"]:
+        responses.append(await ctx.client.get("/posts/", params={"cursor": first.json()["next_cursor"]}))
+    return responses
+
+
+async def post_detail(ctx: LoadContext) -> list[httpx.Response]:
+    return [await ctx.client.get(f"/posts/{ctx.rng.choice(ctx.post_ids)}")]
+
+
+async def comments(ctx: LoadContext) -> list[httpx.Response]:
+    return [await ctx.client.get(f"/comment/post/{ctx.rng.choice(ctx.post_ids)}")]
+
+
+async def sign_in(ctx: LoadContext) -> list[httpx.Response]:
+    return [await ctx.sign_in(ctx.username())]
+
+
+async def create(ctx: LoadContext) -> list[httpx.Response]:
+    headers = {"Authorization": f"Bearer {ctx.rng.choice(ctx.tokens)}"}
+    post = await ctx.client.post(
+        "/posts/", json={"title": sentence(ctx.rng, 3, 8), "content": sentence(ctx.rng, 20, 80)}, headers=headers,
+    )
+    responses = [post]
+    if post.status_code == 200:
+        responses.append(await ctx.client.post(
+            f"/comment/{post.json()['id']}", json={"content": sentence(ctx.rng, 3, 20)}, headers=headers,
+        ))
+    return responses
+
+
+async def run_scenario(ctx: LoadContext, scenario, duration: float, concurrency: int) -> dict:
+    samples: list[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started_at = time.perf_counter()
+            try:
+                responses = await scenario(ctx)
+            except httpx.HTTPError:
+                errors += 1
+                statuses["exception"] += 1
+                continue
+            samples.append(time.perf_counter() - started_at)
+            for response in responses:
+                statuses[str(response.status_code)] += 1
+                if response.status_code >= 400:
+                    errors += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = summarize(samples, time.perf_counter() - started_at, errors)
+    result["status_codes"] = dict(statuses)
+    return result
+
+
+def _client(base_url: str | None) -> httpx.AsyncClient:
+    if base_url:
+        return httpx.AsyncClient(base_url=base_url, timeout=30)
+    # 한 클라이언트가 모든 요청을 보내므로 요청 한도는 끄고 잰다
+    settings.RATE_LIMIT_ENABLED = False
+    import main as app_module
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://bench", timeout=30)
+
+
+async def main(args):
+    rng = random.Random(args.seed)
+    results = {}
+    async with _client(args.base_url) as client:
+        ctx = LoadContext(client, rng, args.prefix, args.users)
+        await ctx.prepare(token_count=min(args.users, 20) if "create" in args.scenarios else 0, pages=args.id_pages)
+        for name in args.scenarios:
+            results[name] = await run_scenario(ctx, globals()[name], args.duration, args.concurrency)
+            print(f"{name}: {results[name]['count']}회, p95 {results[name]['p95_ms']}ms")
+
+    params = {"base_url": args.base_url or "in-process", "duration": args.duration, "concurrency": args.concurrency,
+              "users": args.users, "prefix": args.prefix, "seed": args.seed}
+    write_report(build_report("load", params, results), args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", help="실행 중인 서버 주소. 없으면 같은 프로세스에서 호출")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--duration", type=float, default=10, help="시나리오마다 실행할 초")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=100, help="benchmarks.seed 의 --users 와 같게")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--id-pages", type=int, default=10, help="글 id 를 모을 피드 페이지 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 리포트 경로")
+    asyncio.run(main(parser.parse_args()))
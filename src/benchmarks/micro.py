@@ -0,0 +1,110 @@
+"""리포지토리 호출과 응답 직렬화 마이크로 벤치마크. benchmarks.seed 로 데이터를 먼저 만든다.
+
+    cd src && python -m benchmarks.micro --iterations 200 --output micro.json
+
+캐시를 거치지 않는 원래 쿼리 경로(get_posts 등)와 캐시가 채워진 경로(get_cached_*)를 따로 잰다.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import func, select
+
+from benchmarks.report import summarize, build_report, write_report
+from database.connection import AsyncSessionLocal, engine
+from database.orm import Post
+from database.repository import PostRepository, CommentRepository
+from schema.response import PostResponse, PostSummaryResponse, CommentResponse, EXCERPT_LENGTH
+from service.json_response import json_response
+from service.pagination import DEFAULT_PAGE_SIZE
+
+
+async def measure(fn, iterations: int, warmup: int, before=None) -> list[float]:
+    samples = []
+    for i in range(warmup + iterations):
+        if before is not None:
+            before()
+        started_at = time.perf_counter()
+        result = fn()
+        if asyncio.iscoroutine(result):
+            await result
+        if i >= warmup:
+            samples.append(time.perf_counter() - started_at)
+    return samples
+
+
+async def run(iterations: int, warmup: int, limit: int, search_query: str, seed: int) -> dict:
+    rng = random.Random(seed)
+    results = {}
+
+    async with AsyncSessionLocal() as session:
+        post_repo = PostRepository(session, session)
+        comment_repo = CommentRepository(session, session)
+
+        low, high = (await session.execute(select(func.min(Post.id), func.max(Post.id)))).one()
+        if high is None:
+            raise SystemExit("글이 없습니다. python -m benchmarks.seed 를 먼저 실행하세요.")
+        middle = (False, (low + high) // 2)
+
+        def random_post_id():
+            return rng.randint(low, high)
+
+        # 매번 새로 읽도록 identity map 을 비운다
+        fresh = session.expunge_all
+
+        cases = {
+            "repo.get_posts.first_page": lambda: post_repo.get_posts(None, limit),
+            "repo.get_posts.deep_page": lambda: post_repo.get_posts(middle, limit),
+            "repo.get_posts_version": lambda: post_repo.get_posts_version(None, limit),
+            "repo.get_post_summaries": lambda: post_repo.get_post_summaries(None, limit, EXCERPT_LENGTH),
+            "repo.get_posts_by_time": lambda: post_repo.get_posts_by_time(limit=limit, excerpt_length=EXCERPT_LENGTH),
+            "repo.get_post_by_id": lambda: post_repo.get_post_by_id(random_post_id()),
+            "repo.get_comments_by_post_id": lambda: comment_repo.get_comments_by_post_id(random_post_id(), None, limit),
+            "repo.search_posts": lambda: post_repo.search_posts(search_query, 0, limit),
+        }
+        for name, fn in cases.items():
+            results[name] = summarize(await measure(fn, iterations, warmup, before=fresh))
+
+        # 캐시가 채워진 뒤의 읽기 (cache hit 비용)
+        await post_repo.get_cached_posts(None, limit)
+        results["repo.get_cached_posts.hit"] = summarize(
+            await measure(lambda: post_repo.get_cached_posts(None, limit), iterations, warmup))
+
+        # 직렬화만 따로: 한 번 읽어 둔 행으로 라우트와 같은 방식으로 응답 본문을 만든다
+        posts, _ = await post_repo.get_posts(None, limit)
+        summary_rows, _ = await post_repo.get_post_summaries(None, limit, EXCERPT_LENGTH)
+        comments, _ = await comment_repo.get_comments_by_post_id(posts[0].id, None, limit) if posts else ([], None)
+        post_entity = await post_repo.get_post_by_id(posts[0].id) if posts else None
+
+    serialization = {
+        "serialize.post_page": lambda: json_response(
+            {"posts": [PostResponse.dict_from_row(post) for post in posts], "next_cursor": None}).body,
+        "serialize.post_summary_page": lambda: json_response(
+            {"posts": [PostSummaryResponse.dict_from_row(row) for row in summary_rows], "next_cursor": None}).body,
+        "serialize.comment_list": lambda: json_response([CommentResponse.dict_from_row(comment) for comment in comments]).body,
+        # 단건 응답은 여전히 모델을 거친다 (비교 기준)
+        "serialize.post_model": lambda: PostResponse.from_orm(post_entity).model_dump_json(),
+    }
+    for name, fn in serialization.items():
+        results[name] = summarize(await measure(fn, iterations, warmup))
+    return results
+
+
+async def main(args):
+    results = await run(args.iterations, args.warmup, args.limit, args.query, args.seed)
+    await engine.dispose()
+    params = {"iterations": args.iterations, "warmup": args.warmup, "limit": args.limit,
+              "query": args.query, "seed": args.seed}
+    write_report(build_report("micro", params, results), args.output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=DEFAULT_PAGE_SIZE, help="페이지 크기")
+    parser.add_argument("--query", default="데이터베이스 cache", help="search_posts 검색어")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="JSON 리포트 경로")
+    asyncio.run(main(parser.parse_args()))
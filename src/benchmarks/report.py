@@ -0,0 +1,89 @@
+"""벤치마크 결과 집계(p50/p95/p99, 처리량)와 실행 간 비교가 가능한 JSON 리포트."""
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+
+from sqlalchemy.engine import make_url
+
+from settings import settings
+
+
+def percentile(sorted_samples: list[float], q: float) -> float:
+    # 선형 보간 (numpy.percentile 기본값과 같음)
+    if not sorted_samples:
+        return 0.0
+    position = (len(sorted_samples) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_samples[lower]
+    return sorted_samples[lower] + (sorted_samples[upper] - sorted_samples[lower]) * (position - lower)
+
+
+def summarize(samples: list[float], elapsed: float | None = None, errors: int = 0) -> dict:
+    """samples 는 초 단위. 리포트에는 ms 로 남긴다."""
+    ordered = sorted(samples)
+    total = sum(ordered)
+    result = {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": round(total / len(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+    }
+    # 부하 시나리오는 벽시계 시간, 마이크로 벤치마크는 순수 실행 시간 기준 처리량
+    seconds = elapsed if elapsed is not None else total
+    result["throughput_per_s"] = round(len(ordered) / seconds, 2) if seconds else 0.0
+    return result
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": make_url(settings.DATABASE_URL).get_backend_name(),
+        "cache_backend": settings.CACHE_BACKEND,
+    }
+
+
+def build_report(kind: str, params: dict, results: dict) -> dict:
+    return {
+        "kind": kind,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": environment(),
+        "params": params,
+        "results": results,
+    }
+
+
+def write_report(report: dict, output: str | None):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if output:
+        with open(output, "w", encoding="UTF-8") as f:
+            f.write(text + "\n")
+    print_table(report["results"])
+    if output:
+        print(f"\n결과 저장: {output}")
+
+
+def print_table(results: dict):
+    print(f"{'name':<32}{'count':>8}{'err':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'req/s':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<32}{stats['count']:>8}{stats['errors']:>6}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}{stats['throughput_per_s']:>10.1f}"
+        )
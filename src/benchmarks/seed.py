@@ -0,0 +1,127 @@
+"""벤치마크용 데이터 생성: 사용자 N명, 글 M개, 글마다 댓글 K개.
+
+    cd src && python -m benchmarks.seed --users 100 --posts 5000 --comments 10 --create-tables
+
+같은 --seed 면 같은 데이터가 만들어진다. 사용자 이름은 {prefix}_{번호}, 비밀번호는 BENCH_PASSWORD 이고
+--reset 을 주면 같은 prefix 의 사용자(와 CASCADE 로 글/댓글)를 먼저 지운다.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+import bcrypt
+from sqlalchemy import delete, func, insert, select
+
+from database.connection import engine
+from database.orm import Base, User, Post, Comment, utcnow
+from settings import settings
+
+BENCH_PASSWORD = "bench-password"
+
+# 영어 단어와 한글 단어를 섞어 FULLTEXT(ngram)/역색인 검색에도 쓸 수 있게 한다
+WORDS = (
+    "fastapi python async database index query cache latency replica cursor pagination "
+    "benchmark server client request response token session commit rollback schema "
+    "블로그 개발 성능 최적화 데이터베이스 캐시 검색 댓글 게시글 페이지 서버 배포 "
+    "테스트 인덱스 쿼리 트랜잭션 비동기 응답 요청 사용자 공지 이미지 업로드"
+).split()
+
+
+def sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words)))
+
+
+async def _max_id(conn, column) -> int:
+    return await conn.scalar(select(func.coalesce(func.max(column), 0)))
+
+
+async def _insert_batches(conn, table, rows: list[dict], batch_size: int):
+    for start in range(0, len(rows), batch_size):
+        await conn.execute(insert(table), rows[start:start + batch_size])
+
+
+async def seed(
+        users: int, posts: int, comments: int,
+        prefix: str = "bench", seed: int = 42, batch_size: int = 1000,
+        create_tables: bool = False, reset: bool = False,
+):
+    rng = random.Random(seed)
+    # 해싱은 한 번만 하고 모든 사용자가 같은 해시를 쓴다
+    hashed_password = bcrypt.hashpw(
+        BENCH_PASSWORD.encode("UTF-8"), bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    ).decode("UTF-8")
+    now = utcnow()
+
+    async with engine.begin() as conn:
+        if create_tables:
+            await conn.run_sync(Base.metadata.create_all)
+        if reset:
+            await conn.execute(delete(User).where(User.username.like(f"{prefix}\\_%", escape="\\")))
+
+        first_user_id = await _max_id(conn, User.id) + 1
+        first_post_id = await _max_id(conn, Post.id) + 1
+
+        user_ids = list(range(first_user_id, first_user_id + users))
+        await _insert_batches(conn, User.__table__, [
+            {"id": user_id, "username": f"{prefix}_{i}", "hashed_password": hashed_password,
+             "email": None, "admin": False, "token_version": 0}
+            for i, user_id in enumerate(user_ids)
+        ], batch_size)
+
+        post_rows = []
+        for i in range(posts):
+            created_at = now - timedelta(seconds=(posts - i) * 60 + rng.randint(0, 59))
+            post_rows.append({
+                "id": first_post_id + i,
+                "title": sentence(rng, 3, 8)[:200],
+                "content": "\n".join(sentence(rng, 10, 40) for _ in range(rng.randint(1, 8))),
+                "user_id": rng.choice(user_ids),
+                "created_at": created_at,
+                "updated_at": created_at,
+                "is_pinned": rng.random() < 0.002,
+                "comment_count": comments,
+            })
+        await _insert_batches(conn, Post.__table__, post_rows, batch_size)
+
+        comment_rows = []
+        for post in post_rows:
+            for _ in range(comments):
+                comment_rows.append({
+                    "post_id": post["id"],
+                    "user_id": rng.choice(user_ids),
+                    "content": sentence(rng, 3, 30),
+                    "updated_at": post["created_at"],
+                })
+                if len(comment_rows) >= batch_size:
+                    await conn.execute(insert(Comment.__table__), comment_rows)
+                    comment_rows = []
+        if comment_rows:
+            await conn.execute(insert(Comment.__table__), comment_rows)
+
+    return {"users": users, "posts": posts, "comments": posts * comments,
+            "first_user_id": first_user_id, "first_post_id": first_post_id}
+
+
+async def main(args):
+    started_at = time.perf_counter()
+    result = await seed(
+        args.users, args.posts, args.comments, prefix=args.prefix, seed=args.seed,
+        batch_size=args.batch_size, create_tables=args.create_tables, reset=args.reset,
+    )
+    await engine.dispose()
+    print(f"생성 완료 ({time.perf_counter() - started_at:.1f}s): {result}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--posts", type=int, default=5_000)
+    parser.add_argument("--comments", type=int, default=10, help="글마다 댓글 수")
+    parser.add_argument("--prefix", default="bench")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--create-tables", action="store_true", help="alembic 대신 create_all 로 테이블 생성 (로컬 SQLite 용)")
+    parser.add_argument("--reset", action="store_true", help="같은 prefix 의 기존 데이터를 먼저 삭제")
+    asyncio.run(main(parser.parse_args()))
@@ -1,17 +1,147 @@
-import os
+import asyncio
+import itertools
+import logging
+import time
 from contextlib import asynccontextmanager
 
 from dotenv import load_dotenv
+from fastapi import Depends, Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+from service.metrics import record_query, db_pool_wait_seconds, register_callback
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+DATABASE_URL = settings.DATABASE_URL
+
+
+class PoolWaitStats:
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.timeouts = 0
+        self.waiting = 0  # 지금 커넥션을 기다리는 요청 수 (부하 차단 기준)
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        db_pool_wait_seconds.observe(seconds)
+
+
+pool_wait = PoolWaitStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """커넥션을 얻기까지 기다린 시간을 pool_wait 에 기록한다."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        pool_wait.waiting += 1
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_wait.timeouts += 1
+            raise
+        finally:
+            pool_wait.waiting -= 1
+            pool_wait.record(time.perf_counter() - start)
+
+
+def _engine_options(url: str, poolclass=TimedQueuePool) -> dict:
+    options = {"future": True, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _set_session_variables(dbapi_connection, connection_record):
+    # 새 커넥션마다 한 번만 실행된다 (MySQL 엔진에만 등록)
+    # posts.created_at 의 DB 기본값(CURRENT_TIMESTAMP)이 파이썬의 utcnow() 와 같은 UTC 가 되게 한다
+    statements = ["SET SESSION time_zone = '+00:00'"]
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        statements.append(f"SET SESSION max_execution_time = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+    if settings.DB_LOCK_TIMEOUT_SECONDS:
+        statements.append(f"SET SESSION innodb_lock_wait_timeout = {int(settings.DB_LOCK_TIMEOUT_SECONDS)}")
+    cursor = dbapi_connection.cursor()
+    for statement in statements:
+        cursor.execute(statement)
+    cursor.close()
+
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite 는 기본적으로 FK(ON DELETE CASCADE) 를 적용하지 않는다
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_started_at"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = conn.info.pop("query_started_at", None)
+    if started_at is not None:
+        record_query(statement, time.perf_counter() - started_at)
+
+
+def _create_engine(url: str, poolclass=TimedQueuePool):
+    async_engine = create_async_engine(url, **_engine_options(url, poolclass))
+    # 요청별 쿼리 수/시간 집계 (service/metrics.py)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(async_engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    if async_engine.dialect.name == "mysql":
+        event.listen(async_engine.sync_engine, "connect", _set_session_variables)
+    elif async_engine.dialect.name == "sqlite":
+        event.listen(async_engine.sync_engine, "connect", _enable_sqlite_foreign_keys)
+    return async_engine
+
+
+engine = _create_engine(DATABASE_URL)
+
+
+def pool_status() -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            status[name] = method()
+    status.update(
+        wait_count=pool_wait.count,
+        wait_seconds_total=round(pool_wait.total_seconds, 6),
+        wait_seconds_max=round(pool_wait.max_seconds, 6),
+        wait_timeouts=pool_wait.timeouts,
+        waiting=pool_wait.waiting,
+    )
+    status["replicas"] = [replica.status() for replica in replicas]
+    return status
+
+
+def _pool_connections() -> dict:
+    status = pool_status()
+    return {(state,): status[state] for state in ("checkedin", "checkedout", "overflow") if state in status}
+
+
+register_callback("db_pool_connections", "커넥션 풀 상태별 커넥션 수", "gauge", ("state",), _pool_connections)
+register_callback("db_pool_wait_timeouts_total", "풀 대기 시간 초과 횟수", "counter", (), lambda: {(): pool_wait.timeouts})
 
-engine = create_async_engine(
-    DATABASE_URL,
-    future=True
-)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
@@ -22,4 +152,75 @@ AsyncSessionLocal = async_sessionmaker(
 
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+class Replica:
+    """읽기 전용 복제본. 주기적인 SELECT 1 과 드라이버 오류로 상태를 판단한다."""
+
+    def __init__(self, url: str):
+        self.url = make_url(url).render_as_string(hide_password=True)
+        self.engine = _create_engine(url, poolclass=AsyncAdaptedQueuePool)
+        self.sessionmaker = async_sessionmaker(bind=self.engine, expire_on_commit=False, class_=AsyncSession)
+        self.down_until = 0.0
+        self.checked_at = 0.0
+        self.failures = 0
+        event.listen(self.engine.sync_engine, "handle_error", self._on_error)
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def mark_down(self, reason: str):
+        self.failures += 1
+        self.down_until = time.monotonic() + settings.REPLICA_RETRY_AFTER
+        logger.warning("replica %s marked down: %s", self.url, reason)
+
+    def _on_error(self, context):
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, exc.OperationalError):
+            self.mark_down(str(context.original_exception))
+
+    async def ensure_healthy(self) -> bool:
+        if not self.healthy:
+            return False
+        if time.monotonic() - self.checked_at < settings.REPLICA_HEALTH_CHECK_INTERVAL:
+            return True
+        self.checked_at = time.monotonic()
+        try:
+            async with self.engine.connect() as connection:
+                await asyncio.wait_for(connection.execute(text("SELECT 1")), timeout=1)
+        except Exception as e:
+            if self.healthy:  # handle_error 에서 이미 표시했을 수 있다
+                self.mark_down(repr(e))
+            return False
+        return True
+
+    def status(self) -> dict:
+        return {"url": self.url, "healthy": self.healthy, "failures": self.failures}
+
+
+replicas = [Replica(url) for url in settings.DATABASE_REPLICA_URLS]
+_replica_cycle = itertools.cycle(replicas)
+
+
+async def _pick_replica() -> Replica | None:
+    for _ in range(len(replicas)):
+        replica = next(_replica_cycle)
+        if await replica.ensure_healthy():
+            return replica
+    return None
+
+
+async def get_read_db(request: Request, primary: AsyncSession = Depends(get_db)):
+    """GET 전용 세션. 쓸 수 있는 복제본이 없으면 같은 요청의 primary 세션을 그대로 쓴다.
+
+    쓰기 요청과, 방금 쓴 사용자의 요청(ReadYourWritesMiddleware 가 read_primary 를 표시)도 primary 에서 읽는다.
+    """
+    read_primary = request.method not in ("GET", "HEAD") or getattr(request.state, "read_primary", False)
+    replica = await _pick_replica() if replicas and not read_primary else None
+    if replica is None:
+        yield primary
+        return
+    async with replica.sessionmaker() as session:
+        session.info["replica"] = replica
+        yield session
@@ -1,21 +1,40 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, false, func
+from sqlalchemy.dialects import mysql, sqlite
 from sqlalchemy.orm import DeclarativeBase, relationship, Mapped, mapped_column
 
 
+# ETag/Last-Modified 의 기준이 되므로 MySQL 에서도 마이크로초까지 저장한다
+TIMESTAMP_TYPE = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+# DB 가 CURRENT_TIMESTAMP 로 채우는 컬럼. SQLite 는 날짜를 문자열로 비교하므로
+# 바인딩 값도 CURRENT_TIMESTAMP 와 같은 초 단위 형식으로 만들어야 범위/키셋 조건이 맞는다
+SERVER_TIMESTAMP_TYPE = DateTime().with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class Base(DeclarativeBase):
     pass
 
 class User(Base):
     __tablename__ = "users"
-    id: int = Column(Integer, primary_key=True, index=True)
+    # 기본 키는 그 자체로 인덱스라 id 에 따로 인덱스를 두지 않는다 (쓰기마다 갱신 비용만 든다)
+    id: int = Column(Integer, primary_key=True)
     username: str = Column(String(30), unique=True, nullable=False)
     hashed_password = Column(String(128), nullable=False)
     email: str | None = Column(String(255), nullable=True)
     admin = Column(Boolean, default=False)
-    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan")
-    comments = relationship("Comment", back_populates="user", cascade="all, delete")
+    # 올리면 이전에 발급된 JWT 가 모두 무효가 된다
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
+    # 자식 행은 FK 의 ON DELETE CASCADE 로 지워지므로 삭제 전에 컬렉션을 불러오지 않는다
+    posts = relationship("Post", back_populates="author", cascade="all, delete-orphan", passive_deletes=True)
+    comments = relationship("Comment", back_populates="user", cascade="all, delete", passive_deletes=True)
 
     @classmethod
     def create(cls, username: str, hashed_password: str, email: str | None):
@@ -28,15 +47,32 @@ class User(Base):
 
 class Post(Base):
     __tablename__ = "posts"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # GET /posts/ 키셋 페이지네이션 (is_pinned DESC, id DESC) 용
+        Index("ix_posts_is_pinned_id", "is_pinned", "id"),
+        # GET /posts/archive, GET /posts/users/{user_id} 의 기간 조회 (created_at DESC, id DESC) 용
+        Index("ix_posts_created_at", "created_at"),
+        Index("ix_posts_user_id_created_at", "user_id", "created_at"),
+        # GET /posts/search 용 (MySQL 전용)
+        Index(
+            "ft_posts_title_content", "title", "content",
+            mysql_prefix="FULLTEXT", mysql_with_parser="ngram",
+        ).ddl_if(dialect="mysql"),
+    )
+
+    id = Column(Integer, primary_key=True)
     title = Column(String(200), nullable=False)
     content = Column(Text, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    created_at = Column(DateTime, default = datetime.now(timezone.utc))
-    is_pinned = Column(Boolean, default=False)
+    # DB 가 INSERT 시각으로 채운다 (MySQL 은 세션 time_zone 을 UTC 로 맞춘다).
+    # 응답에 쓰지 않아 INSERT 뒤에 다시 읽지 않는다
+    created_at = Column(SERVER_TIMESTAMP_TYPE, nullable=False, server_default=func.current_timestamp())
+    is_pinned = Column(Boolean, default=False, nullable=False, server_default=false())
+    updated_at = Column(TIMESTAMP_TYPE, default=utcnow, onupdate=utcnow)
+    # CommentRepository 가 댓글 추가/삭제와 같은 트랜잭션에서 증감한다
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
     author = relationship("User", back_populates="posts")
-    comments = relationship("Comment", back_populates="post", cascade="all, delete")
+    comments = relationship("Comment", back_populates="post", cascade="all, delete", passive_deletes=True)
 
     @classmethod
     def create(cls, post_data, user_id):
@@ -55,20 +91,50 @@ class Post(Base):
 
 class Comment(Base):
     __tablename__ = "comments"
-
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # GET /comment/post/{post_id} 키셋 페이지네이션 (id DESC) 용
+        Index("ix_comments_post_id_id", "post_id", "id"),
+        # 답글을 부모 여러 개에 대해 한 번에 읽을 때 (parent_id IN (...) ORDER BY id) 용
+        Index("ix_comments_parent_id_id", "parent_id", "id"),
+        # 사용자 삭제(ON DELETE CASCADE)와 관리자 일괄 삭제의 user_id 조회, 댓글이 달린 글 id 까지 인덱스만으로 읽는다
+        Index("ix_comments_user_id_post_id", "user_id", "post_id"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
     post_id: Mapped[int] = mapped_column(ForeignKey("posts.id", ondelete="CASCADE"))
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    # 답글이면 부모 댓글 id. 부모가 지워지면 답글도 함께 지워진다
+    parent_id: Mapped[int | None] = mapped_column(ForeignKey("comments.id", ondelete="CASCADE"), nullable=True)
+    updated_at: Mapped[datetime | None] = mapped_column(TIMESTAMP_TYPE, default=utcnow, onupdate=utcnow)
 
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
 
     @classmethod
-    def create(cls, post_id, content, user_id):
+    def create(cls, post_id, content, user_id, parent_id=None):
         return cls(
             post_id=post_id,
             content=content,
             user_id=user_id,
-        )
\ No newline at end of file
+            parent_id=parent_id,
+        )
+
+
+class Job(Base):
+    """JOBS_DURABLE 일 때 service.jobs 가 쓰는 작업 큐. 끝난 작업은 지우고 끝내 실패한 작업만 남긴다."""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # 재시작 시 남은 작업을 실행 예정 순으로 다시 읽는다
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending", server_default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    run_at: Mapped[datetime] = mapped_column(TIMESTAMP_TYPE, nullable=False, default=utcnow)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP_TYPE, nullable=False, default=utcnow)
@@ -1,13 +1,128 @@
+from datetime import datetime
 from typing import Annotated
 
 from fastapi import Depends, HTTPException
-from sqlalchemy import select, update, desc
+from sqlalchemy import select, update, delete, desc, or_, and_, func
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from database.connection import get_db
+from database.connection import get_db, get_read_db, AsyncSessionLocal
 from database.orm import User, Post, Comment
 from schema.request import CreatePostRequest
+from schema.response import PostResponse, PostSummaryResponse, CommentResponse
+from service.cache import cache
+from service.jobs import jobs
+from service.pagination import encode_cursor
+from service.search import search_index
+from settings import settings
+
+# 읽기 캐시 키. 목록 페이지는 어떤 글이 바뀌어도 밀리므로 접두사 단위로 비운다
+FEED_PREFIX = "posts:"
+SUMMARY_FEED_PREFIX = "posts:summary:"
+COMMENTS_PREFIX = "comments:"
+# 일괄 작업에서 이보다 많은 글이 바뀌면 글마다 접두사를 훑지 않고 댓글 캐시 전체를 비운다
+BULK_INVALIDATE_POSTS = 20
+
+
+def post_key(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def comments_prefix(post_id: int) -> str:
+    # 한 글의 댓글 페이지/답글 페이지를 모두 덮는 접두사 (끝의 ":" 로 1 과 12 를 구분)
+    return f"{COMMENTS_PREFIX}{post_id}:"
+
+
+def use_fulltext(dialect_name: str) -> bool:
+    if settings.SEARCH_BACKEND != "auto":
+        return settings.SEARCH_BACKEND == "fulltext"
+    return dialect_name == "mysql"
+
+
+def chunked(ids: list[int], size: int):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _read_session_or(primary: AsyncSession, read_session) -> AsyncSession:
+    # 라우터 밖에서 Repository(session) 으로 직접 만들면 primary 만 쓴다
+    return read_session if isinstance(read_session, AsyncSession) else primary
+
+
+async def _execute_read(read_session: AsyncSession, primary: AsyncSession, stmt):
+    try:
+        return await read_session.execute(stmt)
+    except DBAPIError:
+        replica = read_session.info.get("replica")
+        if replica is None:
+            raise
+        # 복제본 장애면 이번 쿼리는 primary 로 다시 실행한다
+        if replica.healthy:
+            replica.mark_down("query failed")
+        await read_session.rollback()
+        return await primary.execute(stmt)
+
+
+# 쓰기 후처리. 커밋 뒤 service.jobs 워커가 실행하므로 쓰기 응답은 커밋까지만 기다린다.
+# 워커는 같은 이벤트 루프에서 바로 깨어나므로 메모리 캐시 기준으로 무효화는 응답이 나가기 전후 ms 안에 끝난다.
+
+@jobs.handler("post_written")
+async def _post_written(post_id: int, reindex: bool = True):
+    await cache.invalidate(post_key(post_id))
+    await cache.invalidate_prefix(FEED_PREFIX)
+    # 프로세스 내 역색인을 쓸 때만 본문을 다시 읽는다 (최신 상태로 색인하므로 순서가 바뀌어도 안전)
+    if reindex and search_index.loaded:
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(select(Post.title, Post.content).where(Post.id == post_id))).one_or_none()
+        if row is None:
+            search_index.discard(post_id)
+        else:
+            search_index.update(post_id, row.title, row.content)
+
+
+@jobs.handler("post_deleted")
+async def _post_deleted(post_id: int):
+    await cache.invalidate_prefix(comments_prefix(post_id))
+    await cache.invalidate(post_key(post_id))
+    await cache.invalidate_prefix(FEED_PREFIX)
+    search_index.discard(post_id)
+
+
+@jobs.handler("comments_changed")
+async def _comments_changed(post_id: int, count_changed: bool = True):
+    await cache.invalidate_prefix(comments_prefix(post_id))
+    if count_changed:
+        # 글 상세와 피드의 댓글 수도 함께 바뀐다
+        await cache.invalidate(post_key(post_id))
+        await cache.invalidate_prefix(FEED_PREFIX)
+
+
+async def _invalidate_comment_pages(post_ids: list[int]):
+    if len(post_ids) > BULK_INVALIDATE_POSTS:
+        await cache.invalidate_prefix(COMMENTS_PREFIX)
+        return
+    for post_id in post_ids:
+        await cache.invalidate_prefix(comments_prefix(post_id))
+
+
+@jobs.handler("posts_bulk_changed")
+async def _posts_bulk_changed(post_ids: list[int], deleted: bool = False):
+    await cache.invalidate(*map(post_key, post_ids))
+    await cache.invalidate_prefix(FEED_PREFIX)
+    if deleted:
+        await _invalidate_comment_pages(post_ids)
+        for post_id in post_ids:
+            search_index.discard(post_id)
+
+
+@jobs.handler("comments_bulk_changed")
+async def _comments_bulk_changed(post_ids: list[int], count_changed: bool = True):
+    await _invalidate_comment_pages(post_ids)
+    if count_changed:
+        await cache.invalidate(*map(post_key, post_ids))
+        await cache.invalidate_prefix(FEED_PREFIX)
 
 
 class UserRepository:
@@ -19,6 +134,14 @@ class UserRepository:
         stmt = select(User).where(User.username == username)
         return await self.session.scalar(stmt)
 
+    async def get_user_by_id(self, user_id: int) -> User | None:
+        return await self.session.get(User, user_id)
+
+    async def bump_token_version(self, user_id: int):
+        stmt = update(User).where(User.id == user_id).values(token_version=User.token_version + 1)
+        await self.session.execute(stmt)
+        await self.session.commit()
+
     async def save_user(self, user:User) -> User:
         self.session.add(user)
         await self.session.commit()
@@ -27,91 +150,516 @@ class UserRepository:
 
 class PostRepository:
 
-    def __init__(self, session: AsyncSession = Depends(get_db)):
+    def __init__(
+            self,
+            session: AsyncSession = Depends(get_db),
+            read_session: AsyncSession = Depends(get_read_db),
+    ):
+        # 쓰기와 쓰기 전 소유권 확인은 session(primary), GET 화면 조회는 read_session(복제본)
         self.session = session
+        self.read_session = _read_session_or(session, read_session)
 
-    async def get_posts(self):
+    async def _read(self, stmt):
+        return await _execute_read(self.read_session, self.session, stmt)
+
+    async def get_posts(self, after: tuple[bool, int] | None = None, limit: int = 20):
+        # 엔티티 대신 응답에 필요한 컬럼만 조인 한 번으로 읽는다 (PostResponse.dict_from_row)
         stmt = (
-            select(Post)
-            .options(selectinload(Post.author))
+            select(Post.id, User.username, Post.title, Post.content, Post.is_pinned, Post.comment_count)
+            .join(User, Post.user_id == User.id)
             .order_by(desc(Post.is_pinned), desc(Post.id))
+            .limit(limit + 1)
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        if after is not None:
+            stmt = stmt.where(self._after_post_key(*after))
+        result = await self._read(stmt)
+        posts = list(result.all())
+
+        # limit + 1 개를 읽어 다음 페이지 존재 여부를 판단
+        if len(posts) <= limit:
+            return posts, None
+        posts = posts[:limit]
+        return posts, (posts[-1].is_pinned, posts[-1].id)
+
+    async def get_posts_version(self, after: tuple[bool, int] | None = None, limit: int = 20):
+        # 304 판단용: 본문 없이 페이지에 걸리는 (id, updated_at) 만 읽는다
+        stmt = (
+            select(Post.id, Post.updated_at)
+            .order_by(desc(Post.is_pinned), desc(Post.id))
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(self._after_post_key(*after))
+        result = await self._read(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def get_cached_posts(self, after: tuple[bool, int] | None, limit: int, version: str | None = None) -> dict:
+        async def load():
+            posts, next_key = await self.get_posts(after, limit)
+            return {
+                "posts": [PostResponse.dict_from_row(post) for post in posts],
+                "next_cursor": encode_cursor(*next_key) if next_key else None,
+            }
+
+        return await cache.get_or_load(f"{FEED_PREFIX}full:{after}:{limit}", load, version)
+
+    async def get_cached_post_summaries(self, after: tuple[bool, int] | None, limit: int, excerpt_length: int) -> dict:
+        async def load():
+            rows, next_key = await self.get_post_summaries(after, limit, excerpt_length)
+            return {
+                "posts": [PostSummaryResponse.dict_from_row(row) for row in rows],
+                "next_cursor": encode_cursor(*next_key) if next_key else None,
+            }
+
+        return await cache.get_or_load(f"{SUMMARY_FEED_PREFIX}{after}:{limit}", load)
+
+    @staticmethod
+    def _summary_columns(excerpt_length: int):
+        return (
+            Post.id,
+            Post.title,
+            User.username,
+            Post.is_pinned,
+            Post.created_at,
+            func.substr(Post.content, 1, excerpt_length + 1).label("excerpt"),
+            Post.comment_count,
+        )
+
+    async def get_post_summaries(self, after: tuple[bool, int] | None = None, limit: int = 20, excerpt_length: int = 150):
+        # ORM 엔티티 대신 목록 화면에 필요한 컬럼만 한 번의 조인 쿼리로 가져온다
+        stmt = (
+            select(*self._summary_columns(excerpt_length))
+            .join(User, Post.user_id == User.id)
+            .order_by(desc(Post.is_pinned), desc(Post.id))
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(self._after_post_key(*after))
+        result = await self._read(stmt)
+        rows = list(result.all())
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].is_pinned, rows[-1].id)
+
+    async def get_posts_by_time(
+            self,
+            since: datetime | None = None,
+            until: datetime | None = None,
+            user_id: int | None = None,
+            after: tuple[datetime, int] | None = None,
+            limit: int = 20,
+            excerpt_length: int = 150,
+    ):
+        """[since, until) 에 작성된 글을 최신순으로. user_id 가 있으면 그 작성자의 글만.
+
+        (created_at), (user_id, created_at) 인덱스를 뒤에서부터 범위로 읽고 limit + 1 개에서 멈춘다.
+        공지 여부와 상관없이 시간순이다.
+        """
+        stmt = (
+            select(*self._summary_columns(excerpt_length))
+            .join(User, Post.user_id == User.id)
+            .order_by(desc(Post.created_at), desc(Post.id))
+            .limit(limit + 1)
+        )
+        if user_id is not None:
+            stmt = stmt.where(Post.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(Post.created_at >= since)
+        if until is not None:
+            stmt = stmt.where(Post.created_at < until)
+        if after is not None:
+            created_at, post_id = after
+            # created_at <= ? 는 중복 조건이지만 있어야 OR 를 인덱스 두 번 읽기 + 정렬이 아니라 한 번의 범위 스캔으로 푼다
+            stmt = stmt.where(
+                Post.created_at <= created_at,
+                or_(Post.created_at < created_at, and_(Post.created_at == created_at, Post.id < post_id)),
+            )
+        rows = list((await self._read(stmt)).all())
+
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1].created_at, rows[-1].id)
+
+    async def search_posts(self, query: str, offset: int = 0, limit: int = 20):
+        columns = (Post.id, Post.title, Post.content, User.username, Post.is_pinned, Post.created_at)
+
+        if self._use_fulltext():
+            score = match(Post.title, Post.content, against=query).in_natural_language_mode()
+            stmt = (
+                select(*columns, score.label("score"))
+                .join(User, Post.user_id == User.id)
+                .where(score > 0)
+                .order_by(desc("score"), desc(Post.id))
+                .offset(offset)
+                .limit(limit + 1)
+            )
+            result = await self._read(stmt)
+            rows = [dict(row._mapping) for row in result.all()]
+        else:
+            if not search_index.loaded:
+                result = await self._read(select(Post.id, Post.title, Post.content))
+                search_index.load(result.all())
+            ranked = dict(search_index.search(query)[offset:offset + limit + 1])
+            stmt = select(*columns).join(User, Post.user_id == User.id).where(Post.id.in_(ranked))
+            result = await self._read(stmt)
+            rows = [dict(row._mapping, score=ranked[row.id]) for row in result.all()]
+            rows.sort(key=lambda row: (-row["score"], -row["id"]))
+
+        return rows[:limit], len(rows) > limit
+
+    def _use_fulltext(self) -> bool:
+        return use_fulltext(self.session.get_bind().dialect.name)
+
+    @staticmethod
+    def _after_post_key(is_pinned: bool, post_id: int):
+        # is_pinned 는 두 값뿐이라 (is_pinned, id) < (p, i) 를 분기로 풀어 쓴다
+        same_group = and_(Post.is_pinned == is_pinned, Post.id < post_id)
+        if is_pinned:
+            return or_(same_group, Post.is_pinned == False)  # noqa: E712
+        return same_group
 
     async def get_post_by_id(self, post_id):
         stmt = select(Post).options(selectinload(Post.author)).where(Post.id == post_id)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_post_version(self, post_id: int):
+        stmt = select(Post.id, Post.updated_at).where(Post.id == post_id)
+        version = (await self._read(stmt)).one_or_none()
+        if version is None and self.read_session is not self.session:
+            # 방금 쓴 글이 아직 복제되지 않았을 수 있으므로 primary 에서 한 번 더 확인
+            version = (await self.session.execute(stmt)).one_or_none()
+        return version
+
+    async def get_cached_post(self, post_id: int, version: str | None = None) -> dict | None:
+        async def load():
+            stmt = select(Post).options(selectinload(Post.author)).where(Post.id == post_id)
+            post = (await self._read(stmt)).scalar_one_or_none()
+            if post is None and self.read_session is not self.session:
+                post = await self.get_post_by_id(post_id)
+            return PostResponse.from_orm(post).model_dump(mode="json") if post else None
+
+        return await cache.get_or_load(post_key(post_id), load, version)
+
+    # 쓰기 메서드는 INSERT/UPDATE/DELETE 한 번과 커밋만 한다.
+    # 기본값은 모두 파이썬 쪽에서 채워지고 expire_on_commit=False 라서 다시 SELECT 할 필요가 없다.
+    # 캐시 무효화와 검색 색인은 jobs.defer 로 커밋 뒤에 실행한다.
+
     async def create_post(self, post:Post):
         self.session.add(post)
+        # id 가 있어야 작업을 만들 수 있으므로 먼저 flush 한다 (INSERT 수는 같음)
+        await self.session.flush()
+        jobs.defer(self.session, "post_written", post_id=post.id)
         await self.session.commit()
-        stmt = select(Post).options(selectinload(Post.author)).where(Post.id==post.id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
-
-    async def update_post(self, post_id, post_data: CreatePostRequest):
-
-        post = await self.get_post_by_id(post_id)
-        if not post:
-            raise HTTPException(status_code=404, detail="Post Not Found")
+        return post
 
+    async def update_post(self, post: Post, post_data: CreatePostRequest):
+        # 라우터가 소유권 확인을 위해 이미 읽어 둔 post(작성자 포함)를 그대로 수정한다
         post.title = post_data.title
         post.content = post_data.content
 
         self.session.add(post)
+        jobs.defer(self.session, "post_written", post_id=post.id)
         await self.session.commit()
-        stmt = select(Post).options(selectinload(Post.author)).where(Post.id==post.id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
+        return post
 
     async def save_post(self, post: Post):  # ✅ pinned 상태만 바꿀 때 사용
         self.session.add(post)
+        jobs.defer(self.session, "post_written", post_id=post.id, reindex=False)
+        await self.session.commit()
+
+    async def delete_post(self, post: Post):
+        # 댓글은 DB 의 ON DELETE CASCADE 로 지운다 (passive_deletes)
+        await self.session.delete(post)
+        jobs.defer(self.session, "post_deleted", post_id=post.id)
         await self.session.commit()
-        await self.session.refresh(post)
 
+    # 관리자 일괄 작업. 표마다 문장 하나를 ADMIN_BULK_CHUNK_SIZE 개 id 씩 나눠 보내고 끝에 한 번만 커밋한다.
+    # id 는 정렬해 두어 동시에 도는 다른 일괄 작업과 같은 순서로 잠근다.
 
+    async def pin_posts(self, post_ids: list[int], is_pinned: bool) -> int:
+        return await self._update_posts(post_ids, is_pinned=is_pinned)
+
+    async def reassign_posts(self, post_ids: list[int], user_id: int) -> int:
+        return await self._update_posts(post_ids, user_id=user_id)
+
+    async def _update_posts(self, post_ids: list[int], **values) -> int:
+        post_ids = sorted(set(post_ids))
+        updated = 0
+        for chunk in chunked(post_ids, settings.ADMIN_BULK_CHUNK_SIZE):
+            # updated_at 은 onupdate 로 함께 바뀌어 ETag 도 달라진다
+            stmt = update(Post).where(Post.id.in_(chunk)).values(**values).execution_options(synchronize_session=False)
+            updated += (await self.session.execute(stmt)).rowcount
+        jobs.defer(self.session, "posts_bulk_changed", post_ids=post_ids)
+        await self.session.commit()
+        return updated
 
-    async def delete_post(self, post_id: int):
-        post = await self.get_post_by_id(post_id)
-        if post:
-            await self.session.delete(post)
+    async def delete_posts(self, post_ids: list[int]) -> int:
+        # 댓글은 ON DELETE CASCADE 로 함께 지워진다
+        post_ids = sorted(set(post_ids))
+        deleted = 0
+        for chunk in chunked(post_ids, settings.ADMIN_BULK_CHUNK_SIZE):
+            stmt = delete(Post).where(Post.id.in_(chunk)).execution_options(synchronize_session=False)
+            deleted += (await self.session.execute(stmt)).rowcount
+        jobs.defer(self.session, "posts_bulk_changed", post_ids=post_ids, deleted=True)
+        await self.session.commit()
+        return deleted
+
+    async def delete_posts_by_user(self, user_id: int) -> int:
+        # 캐시/색인에서 지울 id 를 먼저 읽고, 삭제는 user_id 조건 한 문장으로 한다
+        post_ids = list(await self.session.scalars(select(Post.id).where(Post.user_id == user_id).order_by(Post.id)))
+        stmt = delete(Post).where(Post.user_id == user_id).execution_options(synchronize_session=False)
+        deleted = (await self.session.execute(stmt)).rowcount
+        if post_ids:
+            jobs.defer(self.session, "posts_bulk_changed", post_ids=post_ids, deleted=True)
+        await self.session.commit()
+        return deleted
+
+    async def reconcile_comment_counts(self, batch_size: int = 10_000) -> int:
+        # 어긋난 카운터를 id 구간별 UPDATE 로 바로잡는다 (긴 잠금을 피하려고 구간마다 커밋)
+        max_id = await self.session.scalar(select(func.max(Post.id))) or 0
+        actual = (
+            select(func.count(Comment.id))
+            .where(Comment.post_id == Post.id)
+            .scalar_subquery()
+        )
+        repaired = 0
+        for start in range(0, max_id + 1, batch_size):
+            stmt = (
+                update(Post)
+                .where(Post.id >= start, Post.id < start + batch_size, Post.comment_count != actual)
+                .values(comment_count=actual)
+                .execution_options(synchronize_session=False)
+            )
+            result = await self.session.execute(stmt)
             await self.session.commit()
+            repaired += result.rowcount
+        # 캐시 무효화는 호출하는 쪽에서 한다 (CLI 에서 메모리 캐시를 비우면 자기 프로세스만 비워진다)
+        return repaired
 
 
 class CommentRepository:
-    def __init__(self, session: AsyncSession = Depends(get_db)):
+    def __init__(
+            self,
+            session: AsyncSession = Depends(get_db),
+            read_session: AsyncSession = Depends(get_read_db),
+    ):
+        # 쓰기와 쓰기 전 소유권 확인은 session(primary), GET 화면 조회는 read_session(복제본)
         self.session = session
+        self.read_session = _read_session_or(session, read_session)
+
+    async def _read(self, stmt):
+        return await _execute_read(self.read_session, self.session, stmt)
 
     async def create_comment(self,comment: Comment):
+        if comment.parent_id is not None:
+            if await self.get_comment_post_id(comment.parent_id) != comment.post_id:
+                raise HTTPException(status_code=404, detail="Parent Comment Not Found")
+
+        # 댓글 수 증가가 곧 글 존재 확인이다 (없는 글이면 0행이 바뀜)
+        result = await self.session.execute(self._increment_comment_count(comment.post_id))
+        if result.rowcount == 0:
+            await self.session.rollback()
+            raise HTTPException(status_code=404, detail="Post Not Found")
+
         self.session.add(comment)
+        jobs.defer(self.session, "comments_changed", post_id=comment.post_id)
         await self.session.commit()
-
-        stmt = select(Comment).options(selectinload(Comment.user)).where(Comment.id==comment.id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one()
+        return comment
 
     async def get_comment_by_comment_id(self, comment_id):
         stmt = select(Comment).options(selectinload(Comment.user)).where(Comment.id==comment_id)
         result = await self.session.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_comment_post_id(self, comment_id: int) -> int | None:
+        return await self.session.scalar(select(Comment.post_id).where(Comment.id == comment_id))
+
     async def update_comment(self, comment: Comment):
+        # get_comment_by_comment_id 로 읽은 댓글(작성자 포함)을 그대로 돌려준다
         self.session.add(comment)
+        jobs.defer(self.session, "comments_changed", post_id=comment.post_id, count_changed=False)
         await self.session.commit()
-
-        stmt = select(Comment).options(selectinload(Comment.user)).where(Comment.id==comment.id)
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none()
+        return comment
 
     async def delete_comment(self, comment: Comment):
+        # 답글은 ON DELETE CASCADE 로 같이 지워지므로 -1 대신 남은 댓글 수로 다시 맞춘다
         await self.session.delete(comment)
+        remaining = select(func.count()).select_from(Comment).where(Comment.post_id == comment.post_id).scalar_subquery()
+        await self.session.execute(update(Post).where(Post.id == comment.post_id).values(comment_count=remaining))
+        jobs.defer(self.session, "comments_changed", post_id=comment.post_id)
         await self.session.commit()
         return
 
+    # 관리자 일괄 작업 (PostRepository 와 같은 방식). 댓글 수가 바뀐 글은 같은 트랜잭션에서 다시 센다
 
-    async def get_comments_by_post_id(self, post_id: int) -> list[Comment]:
-        stmt = select(Comment).options(selectinload(Comment.user)).where(Comment.post_id == post_id).order_by(Comment.id.desc())
-        result = await self.session.execute(stmt)
-        return list(result.scalars().all())
\ No newline at end of file
+    async def delete_comments(self, comment_ids: list[int]) -> int:
+        comment_ids = sorted(set(comment_ids))
+        post_ids: set[int] = set()
+        deleted = 0
+        for chunk in chunked(comment_ids, settings.ADMIN_BULK_CHUNK_SIZE):
+            post_ids.update(await self.session.scalars(select(Comment.post_id).where(Comment.id.in_(chunk)).distinct()))
+            stmt = delete(Comment).where(Comment.id.in_(chunk)).execution_options(synchronize_session=False)
+            deleted += (await self.session.execute(stmt)).rowcount
+        await self._finish_bulk(sorted(post_ids), count_changed=True)
+        return deleted
+
+    async def delete_comments_by_user(self, user_id: int) -> int:
+        post_ids = await self.session.scalars(select(Comment.post_id).where(Comment.user_id == user_id).distinct())
+        post_ids = sorted(post_ids)
+        stmt = delete(Comment).where(Comment.user_id == user_id).execution_options(synchronize_session=False)
+        deleted = (await self.session.execute(stmt)).rowcount
+        await self._finish_bulk(post_ids, count_changed=True)
+        return deleted
+
+    async def reassign_comments(self, comment_ids: list[int], user_id: int) -> int:
+        comment_ids = sorted(set(comment_ids))
+        post_ids: set[int] = set()
+        updated = 0
+        for chunk in chunked(comment_ids, settings.ADMIN_BULK_CHUNK_SIZE):
+            post_ids.update(await self.session.scalars(select(Comment.post_id).where(Comment.id.in_(chunk)).distinct()))
+            stmt = (
+                update(Comment).where(Comment.id.in_(chunk)).values(user_id=user_id)
+                .execution_options(synchronize_session=False)
+            )
+            updated += (await self.session.execute(stmt)).rowcount
+        await self._finish_bulk(sorted(post_ids), count_changed=False)
+        return updated
+
+    async def _finish_bulk(self, post_ids: list[int], count_changed: bool):
+        if count_changed:
+            # 답글이 CASCADE 로 같이 지워지므로 남은 댓글 수로 다시 맞춘다
+            remaining = select(func.count()).select_from(Comment).where(Comment.post_id == Post.id).scalar_subquery()
+            for chunk in chunked(post_ids, settings.ADMIN_BULK_CHUNK_SIZE):
+                stmt = (
+                    update(Post).where(Post.id.in_(chunk)).values(comment_count=remaining)
+                    .execution_options(synchronize_session=False)
+                )
+                await self.session.execute(stmt)
+        if post_ids:
+            jobs.defer(self.session, "comments_bulk_changed", post_ids=post_ids, count_changed=count_changed)
+        await self.session.commit()
+
+    @staticmethod
+    def _increment_comment_count(post_id: int):
+        # 읽고 쓰지 않고 DB 에서 바로 더해 동시 요청에도 값이 어긋나지 않는다.
+        # 삭제는 답글이 CASCADE 로 함께 지워지므로 -1 이 아니라 남은 댓글 수로 다시 센다 (delete_comment)
+        return update(Post).where(Post.id == post_id).values(comment_count=Post.comment_count + 1)
+
+    # 댓글 목록: 최상위 댓글은 최신순 키셋 페이지, 답글은 작성순으로 깊이마다 한 번에 읽는다.
+    # 한 페이지의 쿼리 수는 1 + COMMENT_REPLY_DEPTH + 1 로 스레드 크기와 상관없이 고정된다.
+
+    @staticmethod
+    def _comment_columns():
+        return Comment.id, Comment.content, Comment.user_id, Comment.post_id, Comment.parent_id, User.username
+
+    async def get_comments_by_post_id(self, post_id: int, after: int | None = None, limit: int = 20):
+        stmt = (
+            select(*self._comment_columns())
+            .join(User, Comment.user_id == User.id)
+            .where(Comment.post_id == post_id, Comment.parent_id.is_(None))
+            .order_by(Comment.id.desc())
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(Comment.id < after)
+        rows = list((await self._read(stmt)).all())
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, rows[-1].id
+
+    async def get_replies_by_parent_id(self, parent_id: int, after: int | None = None, limit: int = 20):
+        stmt = (
+            select(*self._comment_columns())
+            .join(User, Comment.user_id == User.id)
+            .where(Comment.parent_id == parent_id)
+            .order_by(Comment.id)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            stmt = stmt.where(Comment.id > after)
+        rows = list((await self._read(stmt)).all())
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, rows[-1].id
+
+    async def _get_reply_previews(self, parent_ids: list[int], per_parent: int):
+        # 부모마다 앞의 per_parent 개와 전체 답글 수를 쿼리 한 번으로 읽는다
+        row_number = func.row_number().over(partition_by=Comment.parent_id, order_by=Comment.id).label("row_number")
+        total = func.count().over(partition_by=Comment.parent_id).label("total")
+        ranked = (
+            select(*self._comment_columns(), row_number, total)
+            .join(User, Comment.user_id == User.id)
+            .where(Comment.parent_id.in_(parent_ids))
+            .subquery()
+        )
+        stmt = select(ranked).where(ranked.c.row_number <= per_parent).order_by(ranked.c.parent_id, ranked.c.id)
+        return (await self._read(stmt)).all()
+
+    async def _count_replies(self, parent_ids: list[int]) -> dict[int, int]:
+        stmt = (
+            select(Comment.parent_id, func.count())
+            .where(Comment.parent_id.in_(parent_ids))
+            .group_by(Comment.parent_id)
+        )
+        return dict((await self._read(stmt)).all())
+
+    async def _build_threads(self, rows) -> list[dict]:
+        threads = [CommentResponse.dict_from_row(row) for row in rows]
+        level = threads
+        for _ in range(settings.COMMENT_REPLY_DEPTH):
+            if not level:
+                break
+            by_id = {}
+            for node in level:
+                node["reply_count"] = 0
+                node["replies"] = []
+                by_id[node["id"]] = node
+            next_level = []
+            for row in await self._get_reply_previews(list(by_id), settings.COMMENT_REPLY_PREVIEW):
+                parent = by_id[row.parent_id]
+                parent["reply_count"] = row.total
+                reply = CommentResponse.dict_from_row(row)
+                parent["replies"].append(reply)
+                next_level.append(reply)
+            level = next_level
+
+        # 깊이 제한에 걸린 마지막 단계는 답글을 싣지 않고 개수만 알려 준다
+        if level:
+            counts = await self._count_replies([node["id"] for node in level])
+            for node in level:
+                node["reply_count"] = counts.get(node["id"], 0)
+                node["replies"] = []
+        return threads
+
+    async def get_comments_version(self, post_id: int):
+        # 304 판단용: 글 전체 댓글의 (개수, 최신 수정 시각, 최대 id) 한 행만 읽는다
+        stmt = select(func.count(), func.max(Comment.updated_at), func.max(Comment.id)).where(Comment.post_id == post_id)
+        return tuple((await self._read(stmt)).one())
+
+    async def get_cached_comments(self, post_id: int, after: int | None, limit: int, version: str | None = None) -> dict:
+        async def load():
+            rows, next_id = await self.get_comments_by_post_id(post_id, after, limit)
+            return {
+                "comments": await self._build_threads(rows),
+                "next_cursor": encode_cursor(next_id) if next_id else None,
+            }
+
+        return await cache.get_or_load(f"{comments_prefix(post_id)}{after}:{limit}", load, version)
+
+    async def get_cached_replies(
+            self, post_id: int, parent_id: int, after: int | None, limit: int, version: str | None = None,
+    ) -> dict:
+        async def load():
+            rows, next_id = await self.get_replies_by_parent_id(parent_id, after, limit)
+            return {
+                "comments": await self._build_threads(rows),
+                "next_cursor": encode_cursor(next_id) if next_id else None,
+            }
+
+        return await cache.get_or_load(f"{comments_prefix(post_id)}replies:{parent_id}:{after}:{limit}", load, version)
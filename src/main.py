@@ -1,18 +1,40 @@
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 
-from api import user, post, comment
+from api import user, post, comment, admin, internal
+from service.compression import CompressionMiddleware, PrecompressedStaticFiles
+from service.consistency import ReadYourWritesMiddleware
+from service.file import UploadLimitMiddleware
+from service.jobs import jobs
+from service.json_response import FastJSONResponse
+from service.lifecycle import check_search_backend, warm_up, shut_down
+from service.metrics import MetricsMiddleware
+from service.rate_limit import RateLimitMiddleware
+from settings import settings
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_search_backend()
+    # JOBS_DURABLE 이면 지난 프로세스가 남긴 작업부터 다시 넣는다
+    await jobs.start()
+    if settings.STARTUP_WARMUP:
+        await warm_up()
+    yield
+    # 남은 후처리를 마친 뒤 커넥션 풀과 워커 풀을 닫는다
+    await shut_down()
+
+
+app = FastAPI(default_response_class=FastJSONResponse, lifespan=lifespan)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 static_path = os.path.join(BASE_DIR, "static")
 
-app.mount("/static", StaticFiles(directory=static_path), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory=static_path), name="static")
 
 
 origins = [
@@ -23,6 +45,10 @@ origins = [
     # "https://your-frontend.vercel.app",         # 추후 프론트 배포 주소
 ]
 
+if settings.RATE_LIMIT_ENABLED:
+    # CORS 안쪽에 두어 429/503 응답에도 CORS 헤더가 붙게 한다
+    app.add_middleware(RateLimitMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,        # 개발 중엔 ["*"] 로 풀어도 OK
@@ -31,7 +57,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# multipart 본문을 다 받기 전에 업로드 크기를 자른다
+app.add_middleware(UploadLimitMiddleware)
+
+if settings.DATABASE_REPLICA_URLS:
+    # 방금 쓴 사용자의 읽기는 복제 지연이 지날 때까지 primary 로 보낸다
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# 가장 바깥에서 요청 전체(다른 미들웨어의 429/503/413 포함)를 잰다
+app.add_middleware(MetricsMiddleware)
+
 
 app.include_router(user.router)
 app.include_router(post.router)
-app.include_router(comment.router)
\ No newline at end of file
+app.include_router(comment.router)
+app.include_router(admin.router)
+app.include_router(internal.router)
+app.include_router(internal.metrics_router)
\ No newline at end of file
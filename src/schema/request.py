@@ -2,6 +2,8 @@ from typing import Annotated
 
 from pydantic import BaseModel, Field, EmailStr
 
+from settings import settings
+
 
 class SignUpRequest(BaseModel):
     username: Annotated[str, Field(min_length=3, max_length=30, description="3자 이상 사용자 이름")]
@@ -21,3 +23,16 @@ class CreatePostRequest(BaseModel):
 
 class CreateCommentRequest(BaseModel):
     content: str
+    parent_id: Annotated[int | None, Field(description="답글이면 부모 댓글 id")] = None
+
+
+class BulkIdsRequest(BaseModel):
+    ids: Annotated[list[int], Field(min_length=1, max_length=settings.ADMIN_BULK_MAX_IDS, description="대상 id 목록")]
+
+
+class BulkPinRequest(BulkIdsRequest):
+    is_pinned: bool
+
+
+class BulkReassignRequest(BulkIdsRequest):
+    user_id: Annotated[int, Field(description="새 작성자 id")]
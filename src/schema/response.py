@@ -1,8 +1,12 @@
+from datetime import datetime
 from typing import Annotated
 
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 
 from database.orm import Post, Comment
+from service.search import highlight, SNIPPET_LENGTH
+
+EXCERPT_LENGTH = 150
 
 
 class SignUpResponse(BaseModel):
@@ -23,35 +27,140 @@ class PostResponse(BaseModel):
     title: str
     content: str
     is_pinned: bool  # ✅ 추가
+    comment_count: int
 
     @classmethod
-    def from_orm(cls, post: Post):
+    def from_orm(cls, post: Post, username: str | None = None):
+        # 방금 작성한 글처럼 author 를 읽지 않았다면 username 을 직접 넘긴다
         return cls(
             id=post.id,
             title=post.title,
             content=post.content,
-            username=post.author.username,
+            username=username or post.author.username,
             is_pinned=post.is_pinned,  # ✅ 추가
+            comment_count=post.comment_count,
         )
 
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        # 목록용 빠른 경로: 컬럼 타입이 이미 응답 타입과 같으므로 모델을 거치지 않고 바로 옮긴다
+        return {
+            "id": row.id,
+            "username": row.username,
+            "title": row.title,
+            "content": row.content,
+            "is_pinned": row.is_pinned,
+            "comment_count": row.comment_count,
+        }
+
     model_config = ConfigDict(from_attributes=True)
 
 
+class PostPageResponse(BaseModel):
+    posts: list[PostResponse]
+    next_cursor: str | None  # 마지막 페이지면 None
+
+
+class PostSummaryResponse(BaseModel):
+    id: int
+    title: str
+    username: str
+    is_pinned: bool
+    created_at: datetime | None
+    excerpt: str
+    comment_count: int
+
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        # excerpt 는 EXCERPT_LENGTH + 1 글자까지 조회되므로 넘치면 잘린 본문이다
+        excerpt = row.excerpt
+        if len(excerpt) > EXCERPT_LENGTH:
+            excerpt = excerpt[:EXCERPT_LENGTH] + "…"
+        return {
+            "id": row.id,
+            "title": row.title,
+            "username": row.username,
+            "is_pinned": row.is_pinned,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "excerpt": excerpt,
+            "comment_count": row.comment_count,
+        }
+
+
+class PostSummaryPageResponse(BaseModel):
+    posts: list[PostSummaryResponse]
+    next_cursor: str | None
+
+
+class PostSearchResult(BaseModel):
+    id: int
+    title: str  # 검색어가 <mark> 로 감싸진 HTML
+    snippet: str  # 검색어 주변 본문 발췌 (HTML)
+    username: str
+    is_pinned: bool
+    created_at: datetime | None
+    score: float
+
+    @classmethod
+    def from_row(cls, row: dict, terms: list[str]):
+        return cls(
+            id=row["id"],
+            title=highlight(row["title"], terms),
+            snippet=highlight(row["content"], terms, SNIPPET_LENGTH),
+            username=row["username"],
+            is_pinned=row["is_pinned"],
+            created_at=row["created_at"],
+            score=row["score"],
+        )
+
+
+class PostSearchPageResponse(BaseModel):
+    posts: list[PostSearchResult]
+    next_cursor: str | None
+
+
 class CommentResponse(BaseModel):
     id: int
     content: str
     user_id: int
     post_id: int
     username: str
+    parent_id: int | None = None
 
     @classmethod
-    def from_orm(cls, comment: Comment):
+    def from_orm(cls, comment: Comment, username: str | None = None):
         return cls(
             id=comment.id,
             content=comment.content,
             user_id=comment.user_id,
             post_id=comment.post_id,
-            username=comment.user.username
+            username=username or comment.user.username,
+            parent_id=comment.parent_id,
         )
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    @staticmethod
+    def dict_from_row(row) -> dict:
+        return {
+            "id": row.id,
+            "content": row.content,
+            "user_id": row.user_id,
+            "post_id": row.post_id,
+            "username": row.username,
+            "parent_id": row.parent_id,
+        }
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class CommentThreadResponse(CommentResponse):
+    reply_count: int  # 직접 달린 답글 전체 수
+    replies: list["CommentThreadResponse"]  # 앞쪽 일부만. 더 있으면 /comment/{id}/replies 로 이어서 읽는다
+
+
+class CommentPageResponse(BaseModel):
+    comments: list[CommentThreadResponse]
+    next_cursor: str | None
+
+
+class BulkResultResponse(BaseModel):
+    affected: Annotated[int, Field(description="바뀌거나 지워진 행 수 (함께 지워진 답글/댓글은 제외)")]
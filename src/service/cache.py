@@ -0,0 +1,180 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+from service.metrics import register_callback
+from settings import settings
+
+
+class MemoryCache:
+    """프로세스 내 LRU + TTL 캐시. 값은 JSON 으로 직렬화 가능한 형태만 저장한다."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    async def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value, ttl: float | None = None):
+        self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._data.pop(key, None)
+
+    async def delete_prefix(self, prefix: str):
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+
+
+class RedisCache:
+    """여러 워커가 공유하는 Redis 캐시. redis 패키지는 이 백엔드를 쓸 때만 필요하다."""
+
+    def __init__(self, url: str, ttl: float):
+        from redis import asyncio as aioredis
+
+        self.ttl = ttl
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str):
+        raw = await self._redis.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value, ttl: float | None = None):
+        await self._redis.set(key, json.dumps(value), px=int((ttl or self.ttl) * 1000))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def delete_prefix(self, prefix: str):
+        keys = [key async for key in self._redis.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+
+class NullCache:
+
+    async def get(self, key: str):
+        return None
+
+    async def set(self, key: str, value, ttl: float | None = None):
+        pass
+
+    async def delete(self, *keys: str):
+        pass
+
+    async def delete_prefix(self, prefix: str):
+        pass
+
+
+_LOAD_FAILED = object()
+
+
+class ReadThroughCache:
+    """백엔드 앞단에서 hit/miss 를 집계하고, 같은 키의 동시 miss 는 한 번만 로드한다.
+
+    version 을 주면 값과 함께 저장하고, 저장된 version 이 다르면 miss 로 본다.
+    무효화 작업이 늦거나 다른 워커의 캐시가 남아 있어도 방금 읽은 버전과 다른 본문은 내보내지 않는다.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stale = 0
+        self._inflight: dict[tuple[str, str | None], asyncio.Future] = {}
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], version: str | None = None):
+        cached = await self.backend.get(key)
+        if cached is not None:
+            if version is None:
+                self.hits += 1
+                return cached
+            if cached.get("version") == version:
+                self.hits += 1
+                return cached["value"]
+            self.stale += 1
+        self.misses += 1
+
+        inflight_key = (key, version)
+        inflight = self._inflight.get(inflight_key)
+        if inflight is not None:
+            # 먼저 도착한 요청의 쿼리 결과를 같이 기다린다 (같은 버전일 때만)
+            self.coalesced += 1
+            value = await asyncio.shield(inflight)
+            if value is not _LOAD_FAILED:
+                return value
+            return await loader()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            value = await loader()
+        except BaseException:
+            self._finish(inflight_key, future, _LOAD_FAILED)
+            raise
+
+        # 로드 도중 무효화됐다면 이미 낡은 값일 수 있으므로 저장하지 않는다
+        if self._inflight.get(inflight_key) is future and value is not None:
+            await self.backend.set(key, value if version is None else {"version": version, "value": value})
+        self._finish(inflight_key, future, value)
+        return value
+
+    def _finish(self, inflight_key: tuple[str, str | None], future: asyncio.Future, value):
+        if self._inflight.get(inflight_key) is future:
+            del self._inflight[inflight_key]
+        if not future.done():
+            future.set_result(value)
+
+    async def invalidate(self, *keys: str):
+        for inflight_key in [k for k in self._inflight if k[0] in keys]:
+            self._forget_inflight(inflight_key)
+        await self.backend.delete(*keys)
+
+    async def invalidate_prefix(self, prefix: str):
+        for inflight_key in [k for k in self._inflight if k[0].startswith(prefix)]:
+            self._forget_inflight(inflight_key)
+        await self.backend.delete_prefix(prefix)
+
+    def _forget_inflight(self, inflight_key: tuple[str, str | None]):
+        future = self._inflight.pop(inflight_key, None)
+        if future is not None and not future.done():
+            # 기다리던 요청들은 각자 다시 조회한다
+            future.set_result(_LOAD_FAILED)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "stale": self.stale}
+
+
+def create_cache_backend():
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("CACHE_BACKEND=redis 에는 REDIS_URL 이 필요합니다.")
+        return RedisCache(settings.REDIS_URL, settings.CACHE_TTL_SECONDS)
+    if settings.CACHE_BACKEND == "none":
+        return NullCache()
+    return MemoryCache(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+
+
+cache = ReadThroughCache(create_cache_backend())
+register_callback(
+    "cache_requests_total", "읽기 캐시 조회 결과 (coalesced 는 miss 중 다른 요청의 로드를 기다린 수, stale 은 버전이 달라 miss 로 본 수)", "counter", ("result",),
+    lambda: {(result,): count for result, count in cache.stats().items()},
+)
@@ -0,0 +1,225 @@
+import gzip
+import mimetypes
+import os
+import stat
+import zlib
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.staticfiles import StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import settings
+
+# brotli 는 선택 의존성이다. 없으면 gzip 만 협상한다
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이미 압축된 형식(이미지 등)은 다시 압축해도 줄지 않는다
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/javascript", "application/xml", "image/svg+xml",
+)
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def is_compressible(content_type: str | None) -> bool:
+    return content_type is not None and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def accepted_encodings(accept_encoding: str | None) -> list[str]:
+    """Accept-Encoding 에서 q > 0 인 br, gzip 을 선호 순서대로 돌려준다 (q 가 같으면 br 우선)."""
+    if not accept_encoding:
+        return []
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+
+    candidates = [name for name in ("br", "gzip") if weights.get(name, weights.get("*", 0)) > 0]
+    return sorted(candidates, key=lambda name: -weights.get(name, weights.get("*", 0)))
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    # 요청마다 압축할 때는 brotli 패키지가 있어야 br 을 쓸 수 있다
+    for encoding in accepted_encodings(accept_encoding):
+        if encoding != "br" or brotli is not None:
+            return encoding
+    return None
+
+
+class _Compressor:
+
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31 → gzip 헤더/트레일러 포함
+            self._zlib = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Accept-Encoding 에 따라 br/gzip 으로 압축한다.
+
+    COMPRESSION_MIN_SIZE 보다 작은 응답, 압축이 소용없는 형식, 이미 Content-Encoding 이 있는 응답
+    (미리 압축해 둔 정적 파일 등), Range 요청의 부분 응답은 그대로 보낸다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(encoding, send).run(self.app, scope, receive)
+
+
+class _CompressedResponse:
+
+    def __init__(self, encoding: str, send: Send):
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.compressor: _Compressor | None = None
+        self.passthrough = False
+
+    async def run(self, app: ASGIApp, scope: Scope, receive: Receive):
+        await app(scope, receive, self.wrapped_send)
+
+    async def wrapped_send(self, message: Message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            # 부분 응답(Range)은 원본 바이트의 일부이므로 압축하면 클라이언트가 이어 붙일 수 없다
+            self.passthrough = (
+                "content-encoding" in headers
+                or "content-range" in headers
+                or not is_compressible(headers.get("content-type"))
+                or message["status"] < 200 or message["status"] in (204, 206, 304)
+            )
+            # 본문 첫 조각을 보고 크기를 판단하기 위해 시작 메시지는 잠시 보류한다
+            self.start = message
+            if self.passthrough:
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                MutableHeaders(raw=self.start["headers"]).add_vary_header("Accept-Encoding")
+                await self.send(self.start)
+                await self.send(message)
+                self.passthrough = True
+                return
+            self.compressor = _Compressor(self.encoding)
+            headers = MutableHeaders(raw=self.start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            # 인코딩마다 바이트가 달라지므로 강한 ETag 는 약한 ETag 로 바꾼다 (If-None-Match 비교는 그대로 동작)
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            await self.send(self.start)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+def precompress_file(path: str) -> list[str]:
+    """path 옆에 .br/.gz 를 만든다. 줄어들지 않으면 만들지 않는다. 만든 경로를 돌려준다."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    written = []
+    outputs = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        outputs["br"] = brotli.compress(data, quality=11)
+    for encoding, compressed in outputs.items():
+        if len(compressed) >= len(data):
+            continue
+        target = path + SUFFIXES[encoding]
+        with open(target + ".part", "wb") as f:
+            f.write(compressed)
+        os.replace(target + ".part", target)
+        written.append(target)
+    return written
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """옆에 미리 만들어 둔 .br/.gz 가 있으면 그 파일을 Content-Encoding 과 함께 그대로 보낸다.
+
+    uploads/ 아래 파일은 이름이 uuid 라 내용이 바뀌지 않으므로 1년 immutable 캐시를 붙인다.
+    """
+
+    immutable_prefixes = ("uploads/",)
+
+    async def get_response(self, path: str, scope: Scope):
+        content_type, _ = mimetypes.guess_type(path)
+        encodings = []
+        if is_compressible(content_type) and scope["method"] in ("GET", "HEAD"):
+            encodings = accepted_encodings(Headers(scope=scope).get("accept-encoding"))
+        for encoding in encodings:
+            # 미리 만든 파일은 그대로 보내기만 하므로 brotli 패키지가 없어도 .br 을 쓸 수 있다
+            try:
+                full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + SUFFIXES[encoding])
+            except (OSError, ValueError):
+                stat_result = None
+            if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                if response.status_code == 200:
+                    response.headers["Content-Type"] = content_type
+                    response.headers["Content-Encoding"] = encoding
+                response.headers.add_vary_header("Accept-Encoding")
+                return self._with_cache_headers(path, response)
+
+        response = await super().get_response(path, scope)
+        if is_compressible(content_type):
+            response.headers.add_vary_header("Accept-Encoding")
+        return self._with_cache_headers(path, response)
+
+    def _with_cache_headers(self, path: str, response):
+        if path.startswith(self.immutable_prefixes):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={settings.STATIC_CACHE_SECONDS}"
+        return response
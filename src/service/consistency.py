@@ -0,0 +1,52 @@
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from service.cache import MemoryCache, RedisCache
+from service.security import token_user_id
+from settings import settings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def create_recent_writers():
+    # 워커가 여럿이면 다음 요청이 다른 워커로 갈 수 있으므로 redis 캐시를 쓸 때는 같이 쓴다
+    ttl = settings.REPLICA_READ_YOUR_WRITES_SECONDS
+    if settings.CACHE_BACKEND == "redis" and settings.REDIS_URL:
+        return RedisCache(settings.REDIS_URL, ttl)
+    return MemoryCache(settings.AUTH_USER_CACHE_MAX_ENTRIES, ttl)
+
+
+class ReadYourWritesMiddleware:
+    """쓰기에 성공한 사용자의 읽기를 REPLICA_READ_YOUR_WRITES_SECONDS 동안 primary 로 보낸다.
+
+    복제본이 따라잡기 전에 방금 쓴 글/댓글이 목록에서 빠져 보이지 않게 한다.
+    get_read_db 가 request.state.read_primary 를 보고 세션을 고른다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.recent_writers = create_recent_writers()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        user_id = await token_user_id(Headers(scope=scope).get("authorization"))
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = f"wrote:{user_id}"
+        if scope["method"] in SAFE_METHODS:
+            if await self.recent_writers.get(key):
+                scope.setdefault("state", {})["read_primary"] = True
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            # 응답을 보내기 전에 기록해야 클라이언트의 바로 다음 읽기가 primary 로 간다
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                await self.recent_writers.set(key, 1)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,58 +1,397 @@
+import asyncio
+import logging
 import os
-import cloudinary
-import cloudinary.uploader
-from typing import Annotated
+import tempfile
+import time
+import uuid
+from typing import Annotated, AsyncIterator, Awaitable
+
+import anyio
 from fastapi import UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from service.compression import is_compressible, precompress_file
+from service.image import can_process, process_image, FORMAT_TYPES
+from service.jobs import jobs
+from service.json_response import FastJSONResponse
+from service.metrics import upload_bytes, upload_seconds
+from settings import settings
 
 load_dotenv()
 
-# Cloudinary 설정: 환경변수에서 가져오기
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
-    secure=True,
-)
+logger = logging.getLogger(__name__)
 
-async def upload_file(file: Annotated[UploadFile, File(...)]):
-    try:
-        result = cloudinary.uploader.upload(file.file)
-        return {"url": result["secure_url"]}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Cloudinary 업로드 실패")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UPLOAD_DIR = os.path.join(ROOT_DIR, "static", "uploads")
+
+# 실제 바이트로 형식을 확인한다 (클라이언트가 보낸 Content-Type 만 믿지 않음)
+SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+}
+EXTENSIONS = {
+    "image/jpeg": ".jpg",
+    "image/png": ".png",
+    "image/gif": ".gif",
+    "image/webp": ".webp",
+}
+
+# multipart 경계와 헤더에 쓰이는 여유분
+MULTIPART_OVERHEAD = 16 * 1024
+UPLOAD_PATHS = ("/posts/upload/image",)
+# 형식 확인에 필요한 파일 앞부분 (webp 는 12바이트)
+SIGNATURE_BYTES = 12
+
+
+def _matches_signature(content_type: str, head: bytes) -> bool:
+    if content_type == "image/webp":
+        return head[:4] == b"RIFF" and head[8:12] == b"WEBP"
+    return any(head.startswith(signature) for signature in SIGNATURES.get(content_type, ()))
+
+
+def _multipart_boundary(content_type: str | None) -> bytes | None:
+    if not content_type or not content_type.lower().startswith("multipart/form-data"):
+        return None
+    for param in content_type.split(";")[1:]:
+        name, _, value = param.strip().partition("=")
+        if name.lower() == "boundary" and value:
+            return value.strip('"').encode("latin-1")
+    return None
+
+
+class MultipartSniffer:
+    """multipart 본문을 받는 대로 훑으며 파일 파트의 Content-Type 과 첫 바이트만 확인한다.
+
+    본문 전체를 모으지 않는다. 파일 내용은 다음 경계를 찾는 데 필요한 꼬리만 남긴다.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.delimiter = b"\r\n--" + boundary
+        # 첫 경계 앞에는 CRLF 가 없으므로 붙여 두고 찾는다
+        self.buffer = b"\r\n"
+        self.state = "content"
+        self.content_type: str | None = None
+
+    def feed(self, data: bytes) -> str | None:
+        """받은 조각을 넣는다. 거절할 파트를 만나면 오류 메시지를 돌려준다."""
+        self.buffer += data
+        while True:
+            if self.state == "content":
+                index = self.buffer.find(self.delimiter)
+                if index < 0:
+                    self.buffer = self.buffer[-(len(self.delimiter) - 1):]
+                    return None
+                self.buffer = self.buffer[index + len(self.delimiter):]
+                self.state = "headers"
+
+            if self.state == "headers":
+                end = self.buffer.find(b"\r\n\r\n")
+                if end < 0:
+                    return None
+                headers, self.buffer = self.buffer[:end], self.buffer[end + 4:]
+                self.content_type = self._file_content_type(headers)
+                if self.content_type is None:
+                    self.state = "content"
+                    continue
+                if self.content_type not in settings.UPLOAD_ALLOWED_TYPES:
+                    return "지원하지 않는 파일 형식입니다."
+                self.state = "head"
+
+            if self.state == "head":
+                # 파일이 SIGNATURE_BYTES 보다 짧으면 다음 경계가 먼저 온다
+                end = self.buffer.find(self.delimiter)
+                if end < 0 and len(self.buffer) < SIGNATURE_BYTES:
+                    return None
+                head = self.buffer[:SIGNATURE_BYTES] if end < 0 else self.buffer[:min(end, SIGNATURE_BYTES)]
+                if not _matches_signature(self.content_type, head):
+                    return "파일 내용이 형식과 일치하지 않습니다."
+                self.state = "content"
+
+    @staticmethod
+    def _file_content_type(raw_headers: bytes) -> str | None:
+        # filename 이 있는 파트(파일)만 본다. Content-Type 이 없으면 빈 문자열 (허용 목록에 없음)
+        headers = {}
+        for line in raw_headers.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if "filename=" not in headers.get("content-disposition", ""):
+            return None
+        return headers.get("content-type", "").split(";")[0].strip().lower()
+
+
+class UploadLimitMiddleware:
+    """업로드 본문을 multipart 파서가 디스크에 받기 전에 크기와 형식으로 거른다.
+
+    Content-Length 가 한도를 넘으면 본문을 읽지 않고 바로 413, 없거나(chunked) 거짓이면
+    receive 에서 받은 바이트를 세다가 한도를 넘는 순간 413 으로 끊는다.
+    파일 파트의 헤더가 도착하면 선언된 Content-Type(UPLOAD_ALLOWED_TYPES)과 첫 바이트를 확인해
+    맞지 않으면 나머지를 받지 않고 415 로 끊는다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] not in UPLOAD_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.UPLOAD_MAX_BYTES + MULTIPART_OVERHEAD
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > limit:
+            response = FastJSONResponse({"detail": "파일이 너무 큽니다."}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+        boundary = _multipart_boundary(Headers(scope=scope).get("content-type"))
+        sniffer = MultipartSniffer(boundary) if boundary else None
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                received += len(body)
+                # FastAPI 는 본문 파싱 중 receive 에서 난 HTTPException 을 그대로 응답으로 보낸다
+                if received > limit:
+                    raise HTTPException(status_code=413, detail="파일이 너무 큽니다.")
+                if sniffer is not None and (error := sniffer.feed(body)) is not None:
+                    raise HTTPException(status_code=415, detail=error)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def validated_chunks(file: UploadFile) -> tuple[str, AsyncIterator[bytes]]:
+    # UploadLimitMiddleware 가 받는 중에 이미 거른다. 미들웨어를 거치지 않는 호출을 위해 같은 확인을 한 번 더 한다
+    content_type = file.content_type
+    if content_type not in settings.UPLOAD_ALLOWED_TYPES:
+        raise HTTPException(status_code=415, detail="지원하지 않는 파일 형식입니다.")
+
+    first = await file.read(settings.UPLOAD_CHUNK_SIZE)
+    if not _matches_signature(content_type, first):
+        raise HTTPException(status_code=415, detail="파일 내용이 형식과 일치하지 않습니다.")
 
+    async def chunks():
+        total = len(first)
+        chunk = first
+        while chunk:
+            if total > settings.UPLOAD_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="파일이 너무 큽니다.")
+            yield chunk
+            chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+            total += len(chunk)
+        upload_bytes.observe(total)
 
+    return content_type, chunks()
 
 
+@jobs.handler("precompress_file")
+async def _precompress_file(path: str):
+    await anyio.to_thread.run_sync(precompress_file, path)
 
 
+class LocalStorage:
+    """main.py 에서 /static 으로 마운트된 static/uploads 에 저장한다."""
 
+    def __init__(self, directory: str = UPLOAD_DIR, url_prefix: str = "/static/uploads"):
+        self.directory = directory
+        self.url_prefix = url_prefix
+        os.makedirs(directory, exist_ok=True)
 
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: str) -> str:
+        path = os.path.join(self.directory, name)
+        partial_path = path + ".part"
+        try:
+            async with await anyio.open_file(partial_path, "wb") as f:
+                async for chunk in chunks:
+                    await f.write(chunk)
+            # 다 쓴 뒤에만 공개 경로로 옮겨 반쯤 쓰인 파일이 서빙되지 않게 한다
+            await anyio.Path(partial_path).rename(path)
+        except BaseException:
+            await anyio.Path(partial_path).unlink(missing_ok=True)
+            raise
+        if is_compressible(content_type):
+            # 매 요청 압축하지 않도록 .br/.gz 를 미리 만들어 둔다 (PrecompressedStaticFiles 가 서빙).
+            # 없어도 원본이 서빙되므로 업로드 응답은 기다리지 않는다
+            jobs.submit("precompress_file", path=path)
+        return f"{self.url_prefix}/{name}"
 
+    async def save_bytes(self, name: str, data: bytes, content_type: str) -> str:
+        async def chunks():
+            yield data
 
+        return await self.save(name, chunks(), content_type)
 
+    async def delete(self, name: str):
+        await anyio.Path(os.path.join(self.directory, name)).unlink(missing_ok=True)
 
 
+class CloudinaryStorage:
 
+    def __init__(self):
+        import cloudinary
+        import cloudinary.uploader
 
+        # Cloudinary 설정: 환경변수에서 가져오기
+        cloudinary.config(
+            cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+            api_key=os.getenv("CLOUDINARY_API_KEY"),
+            api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+            secure=True,
+        )
+        self.uploader = cloudinary.uploader
 
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: str) -> str:
+        # 작은 파일은 메모리, 큰 파일은 디스크에 모아 두었다가 스레드에서 업로드한다
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spool:
+            async for chunk in chunks:
+                await run_in_threadpool(spool.write, chunk)
+            spool.seek(0)
+            public_id, _ = os.path.splitext(name)
+            result = await run_in_threadpool(self.uploader.upload, spool, public_id=public_id)
+        # ✅ Cloudinary에서 제공하는 절대 URL만 그대로 반환
+        return result["secure_url"]
 
+    async def save_bytes(self, name: str, data: bytes, content_type: str) -> str:
+        public_id, _ = os.path.splitext(name)
+        result = await run_in_threadpool(self.uploader.upload, data, public_id=public_id)
+        return result["secure_url"]
 
+    async def delete(self, name: str):
+        public_id, _ = os.path.splitext(name)
+        await run_in_threadpool(self.uploader.destroy, public_id)
 
 
-# async def upload_file(file: Annotated[UploadFile, File(...)]):
-#     ext = file.filename.split(".")[-1]
-#     filename = f"{uuid.uuid4().hex}.{ext}"
-#
-#     # 📌 최상위 static/uploads 경로
-#     root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-#     upload_dir = os.path.join(root_dir, "static", "uploads")
-#     os.makedirs(upload_dir, exist_ok=True)
-#
-#     save_path = os.path.join(upload_dir, filename)
-#     with open(save_path, "wb") as f:
-#         f.write(await file.read())
-#
-#     # 클라이언트에서 접근할 URL 반환
-#     return {"url": f"/static/uploads/{filename}"}
\ No newline at end of file
+class MemoryStorage:
+    """테스트용 가짜 저장소."""
+
+    def __init__(self):
+        self.files: dict[str, tuple[bytes, str]] = {}
+
+    async def save(self, name: str, chunks: AsyncIterator[bytes], content_type: str) -> str:
+        data = b"".join([chunk async for chunk in chunks])
+        return await self.save_bytes(name, data, content_type)
+
+    async def save_bytes(self, name: str, data: bytes, content_type: str) -> str:
+        self.files[name] = (data, content_type)
+        return f"memory://{name}"
+
+    async def delete(self, name: str):
+        self.files.pop(name, None)
+
+
+def create_storage():
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage()
+    if settings.STORAGE_BACKEND == "memory":
+        return MemoryStorage()
+    return CloudinaryStorage()
+
+
+storage = create_storage()
+
+
+async def _spool_to_disk(chunks: AsyncIterator[bytes], suffix: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        async with await anyio.open_file(path, "wb") as f:
+            async for chunk in chunks:
+                await f.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+async def _read_from_disk(path: str) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(path, "rb") as f:
+        while chunk := await f.read(settings.UPLOAD_CHUNK_SIZE):
+            yield chunk
+
+
+async def _delete_uploaded(names: list[str]):
+    results = await asyncio.gather(*(storage.delete(name) for name in names), return_exceptions=True)
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning("failed to delete partial upload %s: %r", name, result)
+
+
+async def _upload_with_variants(stem: str, chunks: AsyncIterator[bytes], content_type: str) -> dict:
+    # 원본을 임시 파일로 한 번만 받아 두고, 변환(프로세스 풀)과 원본 저장에 같이 쓴다
+    path = await _spool_to_disk(chunks, EXTENSIONS[content_type])
+    try:
+        try:
+            processed = await process_image(path)
+        except HTTPException:
+            raise
+        except Exception:
+            raise HTTPException(status_code=415, detail="이미지를 처리할 수 없습니다.")
+
+        # 원본과 변환본(크기 × 포맷)을 동시에 올린다. 저장소 왕복이 순서대로 쌓이지 않도록 하되 동시 수는 제한한다
+        semaphore = asyncio.Semaphore(settings.IMAGE_UPLOAD_CONCURRENCY)
+
+        async def bounded(upload: Awaitable[str]) -> str:
+            async with semaphore:
+                return await upload
+
+        names = [f"{stem}{EXTENSIONS[content_type]}"]
+        uploads = [bounded(storage.save(names[0], _read_from_disk(path), content_type))]
+        for label, fmt, _, _, data in processed["variants"]:
+            names.append(f"{stem}_{label}.{fmt}")
+            uploads.append(bounded(storage.save_bytes(names[-1], data, FORMAT_TYPES[fmt])))
+        # 하나가 실패해도 나머지가 끝난 뒤에 임시 파일을 지우도록 모두 기다린다
+        results = await asyncio.gather(*uploads, return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            # 일부만 올라간 채로 남지 않게 성공한 것들을 지운다
+            await _delete_uploaded([name for name, result in zip(names, results) if not isinstance(result, BaseException)])
+            raise errors[0]
+    finally:
+        os.unlink(path)
+
+    url, *variant_urls = results
+    variants: dict[str, dict] = {}
+    for (label, fmt, width, height, _), variant_url in zip(processed["variants"], variant_urls):
+        variant = variants.setdefault(label, {"width": width, "height": height})
+        variant[fmt] = variant_url
+    # 원본보다 넓은 크기들은 같은 파일을 가리킨다
+    for label, source in processed["aliases"].items():
+        variants[label] = dict(variants[source])
+
+    return {"url": url, "width": processed["width"], "height": processed["height"], "variants": variants}
+
+
+async def upload_file(file: Annotated[UploadFile, File(...)]):
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        result = await _upload_file(file)
+        status = 200
+        return result
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    finally:
+        upload_seconds.observe(time.perf_counter() - started_at, status)
+
+
+async def _upload_file(file: UploadFile):
+    content_type, chunks = await validated_chunks(file)
+    stem = uuid.uuid4().hex
+    try:
+        if can_process(content_type):
+            return await _upload_with_variants(stem, chunks, content_type)
+        url = await storage.save(f"{stem}{EXTENSIONS[content_type]}", chunks, content_type)
+    except HTTPException:
+        raise
+    except Exception:
+        raise HTTPException(status_code=500, detail="이미지 업로드 실패")
+    return {"url": url}
@@ -0,0 +1,58 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    # 바이트가 아니라 DB 버전으로 만든 검증자이므로 약한 ETag 다.
+    # 압축 여부와 상관없이 200 과 304 가 같은 값을 보낸다
+    digest = hashlib.sha1(repr(parts).encode("UTF-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    # DB 에는 tz 없는 UTC 로 저장되어 있다
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: datetime | None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match 가 있으면 If-Modified-Since 는 무시한다 (RFC 9110 13.2.2)
+        # 약한 비교 (RFC 9110 8.8.3.2)
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        return False
+    # Last-Modified 는 초 단위로 내보내므로 같은 초 안에서 나중에 고쳐진 글은 since 보다 늦다.
+    # 자르지 않고 비교해 그 경우엔 304 로 답하지 않는다
+    return _as_utc(last_modified) <= since
+
+
+def not_modified_response(
+        request: Request,
+        response: Response,
+        etag: str,
+        last_modified: datetime | None = None,
+) -> Response | None:
+    """검증자 헤더를 붙이고, 클라이언트 사본이 최신이면 본문 없는 304 응답을 돌려준다."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
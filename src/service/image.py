@@ -0,0 +1,71 @@
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow 가 없으면 원본만 저장한다
+    Image = None
+
+from service.worker_pool import BoundedPool
+from settings import settings
+
+FORMAT_TYPES = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+}
+
+# 리사이즈는 CPU 를 오래 쓰므로 GIL 을 피해 별도 프로세스에서 실행한다
+image_pool = BoundedPool(
+    "image",
+    lambda workers: ProcessPoolExecutor(max_workers=workers),
+    max_workers=settings.IMAGE_POOL_SIZE,
+    queue_limit=settings.IMAGE_QUEUE_LIMIT,
+)
+
+
+def can_process(content_type: str) -> bool:
+    # 움직이는 GIF 는 첫 프레임만 남게 되므로 변환하지 않는다
+    return settings.IMAGE_PROCESSING_ENABLED and Image is not None and content_type != "image/gif"
+
+
+def _supported_formats(formats: list[str]) -> list[str]:
+    return [fmt for fmt in formats if fmt in FORMAT_TYPES and (fmt == "jpeg" or features.check(fmt))]
+
+
+def render_variants(path: str, widths: dict[str, int], formats: list[str], quality: int) -> dict:
+    """프로세스 풀에서 실행된다. 원본보다 크게 늘리지는 않는다.
+
+    원본보다 넓은 크기들은 모두 원본 크기가 되므로 한 번만 만들고, 나머지 이름은 aliases 로 돌려준다.
+    """
+    variants = []
+    aliases: dict[str, str] = {}
+    rendered: dict[tuple[int, int], str] = {}
+    with Image.open(path) as original:
+        image = ImageOps.exif_transpose(original)
+        for label, width in widths.items():
+            resized = image.copy()
+            if resized.width > width:
+                resized.thumbnail((width, width * 10))
+            if resized.size in rendered:
+                aliases[label] = rendered[resized.size]
+                continue
+            rendered[resized.size] = label
+            for fmt in _supported_formats(formats):
+                frame = resized
+                if fmt == "jpeg" and frame.mode not in ("RGB", "L"):
+                    frame = frame.convert("RGB")
+                buffer = BytesIO()
+                frame.save(buffer, format=fmt.upper(), quality=quality)
+                variants.append((label, fmt, resized.width, resized.height, buffer.getvalue()))
+        return {"width": image.width, "height": image.height, "variants": variants, "aliases": aliases}
+
+
+async def process_image(path: str) -> dict:
+    return await image_pool.run(
+        render_variants,
+        path,
+        settings.IMAGE_VARIANT_WIDTHS,
+        settings.IMAGE_FORMATS,
+        settings.IMAGE_QUALITY,
+    )
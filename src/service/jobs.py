@@ -0,0 +1,259 @@
+import asyncio
+import contextvars
+import json
+import logging
+import random
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy import event, select, update, delete
+from sqlalchemy.orm import Session
+
+from database.connection import AsyncSessionLocal
+from database.orm import Job, utcnow
+from service.metrics import job_runs, job_seconds, register_callback
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "pending_jobs"
+# defer 가 쓰기 트랜잭션에 더하는 INSERT 수 (라우트의 query_budget 에 더한다)
+JOB_QUERIES = 1 if settings.JOBS_DURABLE else 0
+
+
+@dataclass
+class _Task:
+    name: str
+    payload: dict
+    attempts: int = 0
+    record: Job | None = None  # JOBS_DURABLE 일 때 같은 트랜잭션으로 넣은 jobs 행 (커밋 전까지)
+    job_id: int | None = None
+
+
+class JobQueue:
+    """쓰기 요청의 후처리를 응답 뒤에 실행하는 프로세스 내 작업 큐.
+
+    - defer(session, ...) 로 넣은 작업은 session 이 커밋된 뒤에만 실행되고, 롤백되면 버려진다
+    - 동시에 JOBS_CONCURRENCY 개까지 실행하고, 실패하면 지수 백오프로 JOBS_MAX_ATTEMPTS 번까지 재시도한다
+    - 작업은 여러 번 실행돼도 결과가 같아야 한다 (재시도, 재시작 후 복구)
+    """
+
+    def __init__(self, concurrency: int, max_attempts: int, durable: bool):
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.durable = durable
+        self.handlers: dict[str, Callable[..., Awaitable]] = {}
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._retry_timers: set[asyncio.TimerHandle] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.pending = 0  # 아직 성공/최종 실패하지 않은 작업 (대기, 실행 중, 재시도 대기)
+        self.running = 0
+
+    def handler(self, name: str):
+        def register(fn: Callable[..., Awaitable]):
+            self.handlers[name] = fn
+            return fn
+
+        return register
+
+    def defer(self, session, name: str, **payload):
+        """session 커밋 뒤에 실행할 작업을 넣는다. payload 는 JSON 으로 직렬화할 수 있어야 한다."""
+        task = _Task(name, payload)
+        if self.durable:
+            task.record = Job(name=name, payload=json.dumps(payload))
+            session.add(task.record)
+        session.info.setdefault(PENDING_KEY, []).append(task)
+
+    def submit(self, name: str, **payload):
+        # 트랜잭션과 묶이지 않는 작업 (jobs 테이블에 남기지 않음)
+        self._accept(_Task(name, payload))
+
+    def _accept(self, task: _Task, delay: float = 0):
+        self._ensure_started()
+        self.pending += 1
+        self._idle.clear()
+        self._schedule(task, delay)
+
+    def _schedule(self, task: _Task, delay: float):
+        if delay <= 0:
+            self._queue.put_nowait(task)
+            return
+
+        def fire():
+            self._retry_timers.discard(timer)
+            self._queue.put_nowait(task)
+
+        timer = asyncio.get_running_loop().call_later(delay, fire)
+        self._retry_timers.add(timer)
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._queue is not None and self._loop is loop:
+            return
+        # 처음 쓰거나, 테스트 클라이언트처럼 이벤트 루프가 바뀐 경우 새 루프에서 워커를 띄운다
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._retry_timers.clear()
+        self.pending = self.running = 0
+        # 처음 넣은 요청의 contextvar(요청별 SQL 집계 등)를 워커가 물려받지 않도록 빈 컨텍스트로 만든다
+        self._workers = [
+            loop.create_task(self._work(), name=f"job-worker-{i}", context=contextvars.Context())
+            for i in range(self.concurrency)
+        ]
+
+    async def start(self):
+        self._ensure_started()
+        if self.durable:
+            await self._recover()
+
+    async def _work(self):
+        while True:
+            task = await self._queue.get()
+            self.running += 1
+            try:
+                await self._run(task)
+            except Exception:
+                # jobs 테이블 기록 실패 등. 워커는 계속 돈다
+                logger.exception("job %s bookkeeping failed", task.name)
+                self._finish()
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, task: _Task):
+        task.attempts += 1
+        handler = self.handlers.get(task.name)
+        started_at = time.perf_counter()
+        try:
+            if handler is None:
+                raise LookupError(f"등록되지 않은 작업: {task.name}")
+            await handler(**task.payload)
+        except Exception as e:
+            job_seconds.observe(time.perf_counter() - started_at, task.name)
+            if handler is not None and task.attempts < self.max_attempts:
+                delay = self._backoff(task.attempts)
+                job_runs.inc(1, task.name, "retried")
+                logger.warning("job %s failed (attempt %d), retrying in %.1fs: %r", task.name, task.attempts, delay, e)
+                await self._mark_retry(task, delay, e)
+                self._schedule(task, delay)
+                return
+            job_runs.inc(1, task.name, "failed")
+            logger.error("job %s failed after %d attempts: %r", task.name, task.attempts, e, exc_info=e)
+            await self._mark_failed(task, e)
+            self._finish()
+            return
+
+        job_seconds.observe(time.perf_counter() - started_at, task.name)
+        job_runs.inc(1, task.name, "succeeded")
+        await self._mark_done(task)
+        self._finish()
+
+    def _finish(self):
+        self.pending -= 1
+        if self.pending <= 0:
+            self.pending = 0
+            self._idle.set()
+
+    @staticmethod
+    def _backoff(attempts: int) -> float:
+        delay = min(settings.JOBS_RETRY_MAX_SECONDS, settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+        # 같은 원인으로 실패한 작업들이 한꺼번에 다시 몰리지 않도록 흩어 놓는다
+        return delay * random.uniform(0.5, 1)
+
+    # jobs 테이블 기록. 요청 밖에서 실행되므로 쿼리 예산에 잡히지 않는다
+
+    async def _mark_done(self, task: _Task):
+        if task.job_id is None:
+            return
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(Job).where(Job.id == task.job_id))
+            await session.commit()
+
+    async def _mark_retry(self, task: _Task, delay: float, error: Exception):
+        if task.job_id is None:
+            return
+        await self._update_record(
+            task, attempts=task.attempts, run_at=utcnow() + timedelta(seconds=delay), last_error=repr(error),
+        )
+
+    async def _mark_failed(self, task: _Task, error: Exception):
+        if task.job_id is None:
+            return
+        await self._update_record(task, status="failed", attempts=task.attempts, last_error=repr(error))
+
+    @staticmethod
+    async def _update_record(task: _Task, **values):
+        async with AsyncSessionLocal() as session:
+            await session.execute(update(Job).where(Job.id == task.job_id).values(**values))
+            await session.commit()
+
+    async def _recover(self):
+        # 지난 프로세스가 끝내지 못한 작업을 원래 실행 예정 시각에 맞춰 다시 넣는다
+        async with AsyncSessionLocal() as session:
+            records = (await session.scalars(
+                select(Job).where(Job.status == "pending").order_by(Job.run_at, Job.id)
+            )).all()
+        now = utcnow()
+        for record in records:
+            task = _Task(record.name, json.loads(record.payload), attempts=record.attempts, job_id=record.id)
+            self._accept(task, max(0.0, (record.run_at - now).total_seconds()))
+        if records:
+            logger.info("recovered %d pending jobs", len(records))
+
+    async def drain(self, timeout: float):
+        """남은 작업이 끝나기를 timeout 초까지 기다린 뒤 워커를 멈춘다."""
+        if self._queue is None:
+            return
+        if self.pending:
+            try:
+                await asyncio.wait_for(self._idle.wait(), timeout)
+            except asyncio.TimeoutError:
+                # durable 이면 jobs 테이블에 남아 다음 시작 때 다시 실행된다
+                logger.warning("job queue drain timed out with %d jobs left", self.pending)
+
+        for timer in self._retry_timers:
+            timer.cancel()
+        self._retry_timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue = None
+        self._workers = []
+        self.pending = 0
+        self._idle.set()
+
+    def stats(self) -> dict:
+        return {
+            "pending": self.pending,
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "retry_scheduled": len(self._retry_timers),
+            "durable": self.durable,
+        }
+
+
+jobs = JobQueue(settings.JOBS_CONCURRENCY, settings.JOBS_MAX_ATTEMPTS, settings.JOBS_DURABLE)
+register_callback(
+    "jobs_pending", "아직 끝나지 않은 백그라운드 작업 수 (대기/실행 중/재시도 대기)", "gauge", (),
+    lambda: {(): jobs.pending},
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_pending_jobs(session):
+    for task in session.info.pop(PENDING_KEY, ()):
+        # 세션이 나중에 롤백/종료되면 행 객체를 읽을 수 없으므로 id 만 가져간다
+        if task.record is not None:
+            task.job_id, task.record = task.record.id, None
+        jobs._accept(task)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_jobs(session, previous_transaction):
+    session.info.pop(PENDING_KEY, None)
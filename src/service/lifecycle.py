@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+
+import bcrypt
+from jose import jwt
+
+from database.connection import AsyncSessionLocal, engine, replicas
+from database.orm import utcnow
+from database.repository import PostRepository, CommentRepository, UserRepository, use_fulltext
+from schema.response import EXCERPT_LENGTH
+from service.image import image_pool
+from service.jobs import jobs
+from service.security import SECRET_KEY, ALGORITHM, create_JWT
+from service.user import password_pool
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def check_search_backend():
+    # 프로세스 내 역색인은 워커끼리 공유되지 않아 워커마다 검색 결과가 달라지고 낡는다
+    if settings.WEB_CONCURRENCY > 1 and not use_fulltext(engine.dialect.name):
+        raise RuntimeError(
+            "프로세스 내 검색 색인은 단일 워커 전용입니다. "
+            "WEB_CONCURRENCY=1 로 실행하거나 MySQL FULLTEXT(SEARCH_BACKEND=auto|fulltext)를 쓰세요."
+        )
+
+
+async def prefill_pool(async_engine) -> int:
+    """풀 크기만큼 커넥션을 동시에 열었다가 돌려놓는다. 연 커넥션 수를 돌려준다."""
+    size = getattr(async_engine.pool, "size", lambda: 1)()
+    results = await asyncio.gather(*(async_engine.connect().start() for _ in range(size)), return_exceptions=True)
+    opened = 0
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.warning("pool prefill failed for %s: %r", async_engine.url.render_as_string(), result)
+            continue
+        await result.exec_driver_sql("SELECT 1")
+        await result.close()
+        opened += 1
+    return opened
+
+
+async def warm_queries(session, read_session):
+    """리포지토리 읽기 쿼리를 한 번씩 실행해 SQLAlchemy 컴파일 캐시를 채운다.
+
+    없는 id 로 조회하므로 결과는 비어 있다. 캐시(get_cached_*)는 거치지 않는다.
+    """
+    posts = PostRepository(session, read_session)
+    comments = CommentRepository(session, read_session)
+    users = UserRepository(session)
+    now = utcnow()
+
+    # after/since/user_id 유무에 따라 SQL 이 달라지므로 라우트에서 쓰는 조합을 각각 실행한다
+    for after in (None, (False, 0)):
+        await posts.get_posts(after)
+        await posts.get_posts_version(after)
+        await posts.get_post_summaries(after, excerpt_length=EXCERPT_LENGTH)
+    for user_id in (None, 0):
+        await posts.get_posts_by_time(user_id=user_id, excerpt_length=EXCERPT_LENGTH)
+        await posts.get_posts_by_time(now, now, user_id, (now, 0), excerpt_length=EXCERPT_LENGTH)
+    await posts.get_post_by_id(0)
+    await posts.get_post_version(0)
+    # 프로세스 내 검색 색인도 이때 만들어진다 (첫 검색 요청이 전체 글을 읽지 않게)
+    await posts.search_posts("warmup")
+
+    for after in (None, 0):
+        await comments.get_comments_by_post_id(0, after)
+        await comments.get_replies_by_parent_id(0, after)
+    await comments._get_reply_previews([0], settings.COMMENT_REPLY_PREVIEW)
+    await comments._count_replies([0])
+    await comments.get_comments_version(0)
+    await comments.get_comment_by_comment_id(0)
+    await comments.get_comment_post_id(0)
+
+    await users.get_user_by_username("")
+    await users.get_user_by_id(0)
+
+
+async def warm_auth():
+    # bcrypt 워커 스레드를 띄워 두고, jose 의 서명 백엔드를 한 번 거친다.
+    # 해시는 가장 낮은 cost 로 만들어 시작 시간을 늘리지 않는다
+    hashed = bcrypt.hashpw(b"warmup", bcrypt.gensalt(rounds=4))
+    await asyncio.gather(*(password_pool.run(bcrypt.checkpw, b"warmup", hashed) for _ in range(password_pool.max_workers)))
+    jwt.decode(create_JWT("warmup", False, 0, 0), SECRET_KEY, algorithms=[ALGORITHM])
+
+
+async def warm_up():
+    """요청을 받기 전에 커넥션 풀, 쿼리 컴파일 캐시, bcrypt/JWT 를 데워 둔다.
+
+    실패해도 서버는 뜬다 (첫 요청들이 느려질 뿐이다).
+    """
+    started_at = time.perf_counter()
+    try:
+        await warm_auth()
+        opened = await prefill_pool(engine)
+        for replica in replicas:
+            opened += await prefill_pool(replica.engine)
+
+        async with AsyncSessionLocal() as session:
+            await warm_queries(session, session)
+            # 복제본 엔진은 컴파일 캐시를 따로 가지므로 읽기 쿼리를 복제본마다 한 번 더 실행한다
+            for replica in replicas:
+                if await replica.ensure_healthy():
+                    async with replica.sessionmaker() as read_session:
+                        await warm_queries(session, read_session)
+    except Exception:
+        logger.exception("startup warmup failed")
+        return
+    logger.info("warmed up in %.0fms (%d connections)", (time.perf_counter() - started_at) * 1000, opened)
+
+
+async def shut_down():
+    """남은 후처리 작업을 마친 뒤 커넥션과 워커 풀을 닫는다.
+
+    처리 중인 요청은 서버(uvicorn --timeout-graceful-shutdown)가 lifespan 종료 전에 기다려 준다.
+    """
+    # 요청이 끝나며 넣은 후처리(캐시 무효화 등)를 마저 실행한다
+    await jobs.drain(settings.JOBS_DRAIN_TIMEOUT)
+
+    await engine.dispose()
+    for replica in replicas:
+        await replica.engine.dispose()
+    # 실행 중인 해싱/리사이즈가 끝나기를 기다리되 이벤트 루프는 막지 않는다
+    await asyncio.to_thread(password_pool.shutdown)
+    await asyncio.to_thread(image_pool.shutdown)
@@ -0,0 +1,320 @@
+import logging
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from settings import settings
+
+slow_query_logger = logging.getLogger("sql.slow")
+
+
+def _format_value(value) -> str:
+    # 정수는 정수로, 나머지는 repr 로 내보낸다 (:g 는 유효 숫자 6자리에서 잘린다)
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer()):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        if isinstance(value, float):
+            value = _format_value(value)
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Counter:
+    """라벨 조합별 값을 dict 에 둔다.
+
+    값은 이벤트 루프 스레드에서만 바뀌고 코루틴은 await 사이에서만 전환되므로 락을 걸지 않는다.
+    (스레드/프로세스 풀 작업의 시간도 await 가 끝난 뒤 루프에서 기록한다)
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, *label_values):
+        values = self._values
+        values[label_values] = values.get(label_values, 0) + amount
+
+    def samples(self):
+        for key, value in sorted(self._values.items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Gauge(Counter):
+
+    kind = "gauge"
+
+    def set(self, value: float, *label_values):
+        self._values[label_values] = value
+
+    def dec(self, amount: float = 1, *label_values):
+        self.inc(-amount, *label_values)
+
+
+class Histogram:
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: tuple[float, ...], labels: tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.labels = labels
+        # 라벨별 [버킷별 개수(누적 아님)..., +Inf 개수, 합계]. 누적은 내보낼 때 계산한다
+        self._values: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *label_values):
+        counts = self._values.get(label_values)
+        if counts is None:
+            counts = self._values[label_values] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def samples(self):
+        bucket_labels = self.labels + ("le",)
+        for key, counts in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", _format_labels(bucket_labels, key + (bound,)), cumulative
+            yield f"{self.name}_sum", _format_labels(self.labels, key), counts[-1]
+            yield f"{self.name}_count", _format_labels(self.labels, key), cumulative
+
+
+class CallbackMetric:
+    """스크레이프할 때 collect() 를 불러 값을 읽는다. 풀/캐시처럼 이미 집계를 가진 객체용."""
+
+    def __init__(self, name: str, description: str, kind: str, labels: tuple[str, ...], collect: Callable[[], dict]):
+        self.name = name
+        self.description = description
+        self.kind = kind
+        self.labels = labels
+        self.collect = collect
+
+    def samples(self):
+        for key, value in sorted(self.collect().items()):
+            yield self.name, _format_labels(self.labels, key), value
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식(0.0.4)으로 내보낸다."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+ROUTE_LABELS = ("method", "route")
+
+http_request_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "요청 처리 시간(초)", LATENCY_BUCKETS, ROUTE_LABELS))
+http_response_bytes = registry.register(Histogram(
+    "http_response_size_bytes", "응답 본문 크기(Content-Length 가 있는 응답만)", SIZE_BUCKETS, ROUTE_LABELS))
+http_responses = registry.register(Counter(
+    "http_responses_total", "상태 코드별 응답 수", ROUTE_LABELS + ("status",)))
+http_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "처리 중인 요청 수"))
+
+db_queries = registry.register(Counter(
+    "db_queries_total", "요청 중에 실행된 SQL 문 수", ROUTE_LABELS))
+db_query_seconds = registry.register(Counter(
+    "db_query_seconds_total", "요청 중 SQL 실행에 쓴 시간(초)", ROUTE_LABELS))
+db_slow_queries = registry.register(Counter(
+    "db_slow_queries_total", "SLOW_QUERY_MS 를 넘긴 SQL 문 수", ROUTE_LABELS))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "요청당 SQL 문 수", (0, 1, 2, 3, 5, 8, 13, 21, 50), ROUTE_LABELS))
+db_query_budget_exceeded = registry.register(Counter(
+    "db_query_budget_exceeded_total", "선언한 쿼리 예산을 넘긴 요청 수", ROUTE_LABELS))
+db_pool_wait_seconds = registry.register(Histogram(
+    "db_pool_wait_seconds", "커넥션 풀에서 커넥션을 얻기까지 기다린 시간(초)",
+    (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)))
+
+auth_jwt_decode_seconds = registry.register(Histogram(
+    "auth_jwt_decode_seconds", "JWT 서명 검증/디코드 시간(초)", (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)))
+auth_bcrypt_seconds = registry.register(Histogram(
+    "auth_bcrypt_seconds", "bcrypt 해싱/검증 시간(풀 대기 포함, 초)",
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 2, 5), ("operation",)))
+auth_results = registry.register(Counter(
+    "auth_results_total", "토큰 인증 결과", ("result",)))
+
+upload_seconds = registry.register(Histogram(
+    "upload_duration_seconds", "이미지 업로드 처리 시간(변환 포함, 초)", LATENCY_BUCKETS, ("status",)))
+upload_bytes = registry.register(Histogram(
+    "upload_size_bytes", "받은 업로드 크기", SIZE_BUCKETS))
+
+rate_limited = registry.register(Counter(
+    "rate_limited_total", "요청 한도를 넘어 429 로 거절한 요청 수", ("route",)))
+load_shed = registry.register(Counter(
+    "load_shed_total", "과부하로 503 을 돌려준 요청 수", ("reason",)))
+
+job_runs = registry.register(Counter(
+    "jobs_total", "백그라운드 작업 실행 결과 (retried 는 재시도로 다시 넣은 수)", ("job", "result")))
+job_seconds = registry.register(Histogram(
+    "job_duration_seconds", "백그라운드 작업 한 번의 실행 시간(초)", LATENCY_BUCKETS, ("job",)))
+
+
+def register_callback(name: str, description: str, kind: str, labels: tuple[str, ...], collect: Callable[[], dict]):
+    registry.register(CallbackMetric(name, description, kind, labels, collect))
+
+
+def register_worker_pool(pool):
+    """service.worker_pool.BoundedPool 의 집계를 스크레이프 때 읽어 간다."""
+    register_callback(
+        f"{pool.name}_pool_in_flight", f"{pool.name} 풀에서 실행/대기 중인 작업 수", "gauge", (),
+        lambda: {(): pool.in_flight})
+    register_callback(
+        f"{pool.name}_pool_completed_total", f"{pool.name} 풀에서 성공한 작업 수", "counter", (),
+        lambda: {(): pool.completed})
+    register_callback(
+        f"{pool.name}_pool_failed_total", f"{pool.name} 풀에서 예외로 끝난 작업 수", "counter", (),
+        lambda: {(): pool.failed})
+    register_callback(
+        f"{pool.name}_pool_rejected_total", f"{pool.name} 풀이 가득 차 503 으로 거절한 작업 수", "counter", (),
+        lambda: {(): pool.rejected})
+
+
+@dataclass
+class RequestMetrics:
+    """요청 하나의 시간과 SQL 집계. 미들웨어가 contextvar 에 넣어 둔다."""
+    scope: dict
+    started_at: float = field(default_factory=time.perf_counter)
+    count: int = 0
+    seconds: float = 0.0
+    budget: int | None = None
+    slow: int = 0
+
+    @property
+    def method(self) -> str:
+        return self.scope.get("method", "")
+
+    @property
+    def route(self) -> str:
+        # 라우팅이 끝나야 scope 에 route 가 들어온다. 매칭되지 않은 경로는 라벨 폭발을 막기 위해 묶는다
+        route = self.scope.get("route")
+        return getattr(route, "path", "unmatched")
+
+
+current_request: ContextVar[RequestMetrics | None] = ContextVar("current_request", default=None)
+
+
+def record_query(statement: str, seconds: float):
+    """SQLAlchemy after_cursor_execute 에서 호출된다. 요청 밖(스크립트, 헬스 체크)의 쿼리는 건너뛴다."""
+    request = current_request.get()
+    if request is None:
+        return
+    request.count += 1
+    request.seconds += seconds
+    if seconds * 1000 >= settings.SLOW_QUERY_MS:
+        request.slow += 1
+        slow_query_logger.warning(
+            "slow query %.1fms on %s %s: %s",
+            seconds * 1000, request.method, request.route, " ".join(statement.split())[:500],
+        )
+
+
+def start_request(scope: dict) -> RequestMetrics:
+    http_in_flight.inc()
+    request = RequestMetrics(scope)
+    current_request.set(request)
+    return request
+
+
+def finish_request(request: RequestMetrics, status: int, size: int | None) -> str | None:
+    """집계를 메트릭에 반영하고, 쿼리 예산을 넘겼으면 설명 문자열을 돌려준다."""
+    http_in_flight.dec()
+    method, route = request.method, request.route
+    http_request_seconds.observe(time.perf_counter() - request.started_at, method, route)
+    http_responses.inc(1, method, route, status)
+    if size is not None:
+        http_response_bytes.observe(size, method, route)
+
+    db_queries.inc(request.count, method, route)
+    db_query_seconds.inc(request.seconds, method, route)
+    db_queries_per_request.observe(request.count, method, route)
+    if request.slow:
+        db_slow_queries.inc(request.slow, method, route)
+
+    if request.budget is None or request.count <= request.budget:
+        return None
+    db_query_budget_exceeded.inc(1, method, route)
+    message = f"{method} {route} 에서 쿼리 {request.count}개 실행 (예산 {request.budget}개)"
+    slow_query_logger.warning("query budget exceeded: %s", message)
+    return message
+
+
+class MetricsMiddleware:
+    """요청별 지연 시간/상태 코드/응답 크기/SQL 집계 → /metrics
+
+    응답 본문을 감싸지 않고 send 로 나가는 응답 시작 메시지에서 상태 코드와 Content-Length 만 읽는다.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = start_request(scope)
+        status, size = 500, None
+
+        async def send_wrapper(message: Message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name == b"content-length":
+                        size = int(value)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish_request(request, status, size)
+            current_request.set(None)
+
+
+def query_budget(limit: int):
+    """라우트의 쿼리 예산을 선언한다. 넘기면 경고 로그와 db_query_budget_exceeded_total 에 남고,
+    테스트(tests/conftest.py)에서는 그 테스트가 실패한다.
+
+    @router.get("/{post_id}", dependencies=[Depends(query_budget(2))])
+    """
+    async def declare():
+        request = current_request.get()
+        if request is not None:
+            request.budget = limit
+
+    return declare
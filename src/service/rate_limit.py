@@ -0,0 +1,186 @@
+import logging
+import math
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from database.connection import pool_wait
+from service.json_response import FastJSONResponse
+from service.metrics import rate_limited, load_shed
+from service.security import token_user_id
+from settings import settings
+
+logger = logging.getLogger(__name__)
+
+UNITS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Redis 가 실패한 뒤 다시 시도하기 전까지 프로세스 내 버킷으로 세는 시간(초)
+REDIS_RETRY_SECONDS = 5
+# 부하가 높을 때도 상태를 볼 수 있어야 하므로 제한하지 않는다
+EXEMPT_PREFIXES = ("/metrics", "/internal/")
+
+
+def parse_budget(budget: str) -> tuple[float, float]:
+    # "10/minute" → (버킷 크기 10, 초당 10/60 개 충전)
+    count, _, unit = budget.partition("/")
+    capacity = float(count)
+    return capacity, capacity / UNITS[unit.strip().rstrip("s")]
+
+
+class MemoryRateLimiter:
+    """프로세스 내 토큰 버킷. 워커마다 따로 세므로 실제 한도는 워커 수배가 된다."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: dict[str, list[float]] = {}
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        """토큰 하나를 쓴다. 허용되면 0, 아니면 다시 시도할 수 있을 때까지의 초를 돌려준다."""
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                # 가장 먼저 만든 키부터 버린다 (다시 만들어지면 가득 찬 버킷으로 시작)
+                del self._buckets[next(iter(self._buckets))]
+            self._buckets[key] = [capacity - 1, now]
+            return 0.0
+
+        tokens = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rate
+
+
+class RedisRateLimiter:
+    """여러 워커가 공유하는 토큰 버킷. 계산은 Lua 스크립트로 Redis 안에서 원자적으로 한다.
+
+    Redis 에 닿지 않으면 요청을 막지 않고 REDIS_RETRY_SECONDS 동안 워커별 MemoryRateLimiter 로 센다.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+    local tokens = tonumber(bucket[1]) or capacity
+    local at = tonumber(bucket[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'at', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        from redis import asyncio as aioredis
+
+        # Redis 가 멈췄을 때 요청이 오래 매달리지 않게 짧게 끊는다
+        self._redis = aioredis.from_url(url, socket_connect_timeout=0.5, socket_timeout=0.5)
+        self._script = self._redis.register_script(self.SCRIPT)
+        self._fallback = MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+        self._down_until = 0.0
+
+    async def take(self, key: str, capacity: float, rate: float) -> float:
+        if time.monotonic() < self._down_until:
+            return await self._fallback.take(key, capacity, rate)
+        try:
+            wait = float(await self._script(keys=[f"ratelimit:{key}"], args=[capacity, rate]))
+        except Exception as e:
+            logger.warning("redis rate limiter unavailable, using per-worker buckets for %ds: %r", REDIS_RETRY_SECONDS, e)
+            self._down_until = time.monotonic() + REDIS_RETRY_SECONDS
+            return await self._fallback.take(key, capacity, rate)
+        if self._down_until:
+            logger.info("redis rate limiter recovered")
+            self._down_until = 0.0
+        return wait
+
+
+def create_rate_limiter():
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.REDIS_URL:
+            raise ValueError("RATE_LIMIT_BACKEND=redis 에는 REDIS_URL 이 필요합니다.")
+        return RedisRateLimiter(settings.REDIS_URL)
+    return MemoryRateLimiter(settings.RATE_LIMIT_MAX_KEYS)
+
+
+class RateLimitMiddleware:
+    """부하 차단과 라우트별 요청 한도.
+
+    1. 처리 중인 요청이 SHED_MAX_IN_FLIGHT, 커넥션을 기다리는 요청이 SHED_MAX_POOL_WAITERS 를 넘으면
+       본문을 읽기 전에 503 + Retry-After 로 바로 돌려보낸다.
+    2. RATE_LIMIT_ROUTES 의 "METHOD 경로" 와 정확히 일치하는 요청(없으면 RATE_LIMIT_DEFAULT)은
+       로그인한 사용자면 사용자별, 아니면 IP 별 토큰 버킷으로 세고 넘치면 429 + Retry-After.
+    """
+
+    def __init__(self, app: ASGIApp, limiter=None):
+        self.app = app
+        self.limiter = limiter or create_rate_limiter()
+        self.routes = {route: parse_budget(budget) for route, budget in settings.RATE_LIMIT_ROUTES.items()}
+        self.default = parse_budget(settings.RATE_LIMIT_DEFAULT) if settings.RATE_LIMIT_DEFAULT else None
+        self.in_flight = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"].startswith(EXEMPT_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        reason = self._overloaded()
+        if reason is not None:
+            load_shed.inc(1, reason)
+            response = FastJSONResponse(
+                {"detail": "요청이 많아 잠시 후 다시 시도해 주세요."}, status_code=503,
+                headers={"Retry-After": str(settings.SHED_RETRY_AFTER)},
+            )
+            await response(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        budget = self.routes.get(route)
+        if budget is None and self.default is not None:
+            # 기본 한도는 경로마다가 아니라 클라이언트 전체에 하나
+            route, budget = "default", self.default
+        if budget is not None:
+            retry_after = await self.limiter.take(f"{await self._client_key(scope)}:{route}", *budget)
+            if retry_after:
+                rate_limited.inc(1, route)
+                response = FastJSONResponse(
+                    {"detail": "요청 한도를 넘었습니다. 잠시 후 다시 시도해 주세요."}, status_code=429,
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+                await response(scope, receive, send)
+                return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    def _overloaded(self) -> str | None:
+        if settings.SHED_MAX_IN_FLIGHT and self.in_flight >= settings.SHED_MAX_IN_FLIGHT:
+            return "in_flight"
+        if settings.SHED_MAX_POOL_WAITERS and pool_wait.waiting >= settings.SHED_MAX_POOL_WAITERS:
+            return "db_pool"
+        return None
+
+    @staticmethod
+    async def _client_key(scope: Scope) -> str:
+        headers = Headers(scope=scope)
+        user_id = await token_user_id(headers.get("authorization"))
+        if user_id is not None:
+            return f"user:{user_id}"
+        if settings.RATE_LIMIT_TRUST_FORWARDED:
+            forwarded = headers.get("x-forwarded-for")
+            if forwarded:
+                return f"ip:{forwarded.split(',', 1)[0].strip()}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
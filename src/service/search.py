@@ -0,0 +1,117 @@
+import html
+import math
+import re
+from collections import Counter
+
+WORD_PATTERN = re.compile(r"\w+")
+SNIPPET_LENGTH = 160
+
+
+def tokenize(text: str) -> list[str]:
+    # MySQL ngram 파서(ngram_token_size=2)와 비슷하게 ASCII 가 아닌 단어는 2-gram 으로도 쪼갠다
+    tokens = []
+    for word in WORD_PATTERN.findall(text.lower()):
+        tokens.append(word)
+        if not word.isascii() and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def query_terms(query: str) -> list[str]:
+    return list(dict.fromkeys(WORD_PATTERN.findall(query.lower())))
+
+
+class InvertedIndex:
+    """FULLTEXT 가 없는 DB 용 프로세스 내 역색인. BM25 로 순위를 매긴다.
+
+    첫 검색 때 DB 에서 만들고 이후로는 이 프로세스의 쓰기 작업으로만 갱신한다.
+    다른 워커의 쓰기는 보지 못하므로 단일 워커(개발/테스트)에서만 쓴다 (service.lifecycle 이 시작 시 확인).
+    """
+
+    k1 = 1.2
+    b = 0.75
+    title_weight = 2
+
+    def __init__(self):
+        self.loaded = False
+        self._postings: dict[str, dict[int, int]] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._doc_lengths: dict[int, int] = {}
+        self._total_length = 0
+
+    def load(self, documents):
+        for post_id, title, content in documents:
+            self.add(post_id, title, content)
+        self.loaded = True
+
+    def add(self, post_id: int, title: str, content: str):
+        self.remove(post_id)
+        terms = Counter(tokenize(title) * self.title_weight + tokenize(content))
+        self._doc_terms[post_id] = terms
+        length = self._doc_lengths[post_id] = sum(terms.values())
+        self._total_length += length
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[post_id] = count
+
+    def remove(self, post_id: int):
+        terms = self._doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+        self._total_length -= self._doc_lengths.pop(post_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[post_id]
+            if not postings:
+                del self._postings[term]
+
+    def update(self, post_id: int, title: str, content: str):
+        # 아직 읽어 들이지 않았다면 첫 검색 때 DB 에서 전부 읽으므로 무시한다
+        if self.loaded:
+            self.add(post_id, title, content)
+
+    def discard(self, post_id: int):
+        if self.loaded:
+            self.remove(post_id)
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        if not self._doc_terms:
+            return []
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count
+        scores: dict[int, float] = {}
+
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for post_id, count in postings.items():
+                norm = count + self.k1 * (1 - self.b + self.b * self._doc_lengths[post_id] / average_length)
+                scores[post_id] = scores.get(post_id, 0.0) + idf * count * (self.k1 + 1) / norm
+
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+def highlight(text: str, terms: list[str], length: int | None = None) -> str:
+    """검색어를 <mark> 로 감싼다. length 가 있으면 첫 일치 위치 주변만 잘라낸다."""
+    if length is not None and len(text) > length:
+        positions = [text.lower().find(term) for term in terms]
+        first = min((pos for pos in positions if pos >= 0), default=0)
+        start = max(0, min(first - length // 4, len(text) - length))
+        text = ("…" if start else "") + text[start:start + length] + ("…" if start + length < len(text) else "")
+
+    if not terms:
+        return html.escape(text)
+    # 원문에서 찾은 뒤 조각마다 이스케이프한다 (이스케이프한 뒤에 찾으면 "amp" 가 &amp; 안쪽과 맞는다)
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    end = 0
+    for match in pattern.finditer(text):
+        parts.append(html.escape(text[end:match.start()]))
+        parts.append(f"<mark>{html.escape(match.group(0))}</mark>")
+        end = match.end()
+    parts.append(html.escape(text[end:]))
+    return "".join(parts)
+
+
+search_index = InvertedIndex()
@@ -1,3 +1,6 @@
+import math
+import time
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
@@ -6,12 +9,15 @@ import os
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import jwt, JWTError, ExpiredSignatureError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from database.connection import get_db
 from database.orm import User
 from database.repository import UserRepository
+from service.cache import MemoryCache
+from service.metrics import auth_jwt_decode_seconds, auth_results
+from settings import settings
 
 load_dotenv()
 
@@ -21,38 +27,138 @@ ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/user/sign-in", auto_error=False)
 
+# user_id -> {"username", "admin", "token_version"}
+user_cache = MemoryCache(settings.AUTH_USER_CACHE_MAX_ENTRIES, settings.AUTH_USER_CACHE_TTL_SECONDS)
+
+# 서명을 확인한 토큰 → payload. 같은 토큰이 요청마다 반복해서 오므로 서명 검증은 한 번만 한다 (만료는 매번 확인)
+_decoded_tokens: dict[str, dict] = {}
+DECODED_TOKENS_MAX = 10_000
+
+
+def decode_token(token: str) -> dict:
+    """서명과 만료를 확인한 payload 를 돌려준다. 잘못되거나 만료된 토큰이면 JWTError."""
+    payload = _decoded_tokens.get(token)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if len(_decoded_tokens) >= DECODED_TOKENS_MAX:
+            del _decoded_tokens[next(iter(_decoded_tokens))]
+        _decoded_tokens[token] = payload
+    elif payload.get("exp", math.inf) < time.time():
+        del _decoded_tokens[token]
+        raise ExpiredSignatureError("Signature has expired.")
+    return payload
+
+
+async def token_user_id(authorization: str | None) -> int | None:
+    """Authorization 헤더의 토큰이 유효하면 uid, 아니면 None. 미들웨어에서 요청을 분류할 때 쓴다.
+
+    get_current_user 와 같은 decode_token 으로 확인하고, 캐시에 사용자 정보가 있으면 폐기 여부도 본다.
+    DB 는 조회하지 않으므로 권한 확인에는 쓰지 않는다.
+    """
+    if not authorization or not authorization.startswith("Bearer "):
+        return None
+    try:
+        payload = decode_token(authorization[7:])
+    except JWTError:
+        return None
+    user_id = payload.get("uid")
+    if not isinstance(user_id, int):
+        return None
+    record = await user_cache.get(user_id)
+    if record is not None and record["token_version"] != payload.get("ver", 0):
+        return None
+    return user_id
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    id: int
+    username: str
+    admin: bool
+    token_version: int = 0
+
+
+def _user_record(user: User) -> dict:
+    return {"username": user.username, "admin": bool(user.admin), "token_version": user.token_version}
+
+
 async def get_current_user(
         user_repo: UserRepository = Depends(),
         token: str = Depends(oauth2_scheme),
 
-) -> User:
+) -> CurrentUser:
 
     credentials_exception = HTTPException(status_code=401, detail="Not Authorized")
 
+    started_at = time.perf_counter()
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
     except JWTError:
+        auth_results.inc(1, "invalid_token")
         raise credentials_exception
+    finally:
+        auth_jwt_decode_seconds.observe(time.perf_counter() - started_at)
+
+    user_id = payload.get("uid")
+    if settings.JWT_TRUST_CLAIMS and user_id is not None:
+        # 서명된 클레임을 믿고, 폐기 여부만 캐시된 토큰 버전으로 확인한다
+        record = await user_cache.get(user_id)
+        if record is None:
+            user = await user_repo.get_user_by_id(user_id)
+            if user is None:
+                auth_results.inc(1, "unknown_user")
+                raise credentials_exception
+            record = _user_record(user)
+            await user_cache.set(user_id, record)
+
+        if record["token_version"] != payload.get("ver", 0):
+            auth_results.inc(1, "revoked")
+            raise credentials_exception
+        auth_results.inc(1, "ok")
+        # admin 은 토큰 클레임이 아니라 캐시된 사용자 정보로 판단한다 (강등이 토큰 만료까지 미뤄지지 않게)
+        return CurrentUser(id=user_id, username=username, admin=record["admin"], token_version=record["token_version"])
 
+    # uid 가 없는 예전 토큰이거나 신뢰 모드가 꺼져 있으면 매번 DB 에서 확인
     user = await user_repo.get_user_by_username(username)
-    if user is None:
+    if user is None or user.token_version != payload.get("ver", 0):
+        auth_results.inc(1, "revoked")
         raise credentials_exception
-    return user
+    auth_results.inc(1, "ok")
+    return CurrentUser(id=user.id, username=user.username, admin=bool(user.admin), token_version=user.token_version)
+
 
+async def require_admin(
+        current_user: Annotated[CurrentUser, Depends(get_current_user)],
+        user_repo: Annotated[UserRepository, Depends()],
+) -> CurrentUser:
+    """관리자 전용 라우트. user_cache 는 워커마다 따로라 승격/강등/폐기가 늦게 반영될 수 있으므로
+    캐시된 권한은 보지 않고 DB 로만 판단한다."""
+    user = await user_repo.get_user_by_id(current_user.id)
+    if user is None or user.token_version != current_user.token_version:
+        auth_results.inc(1, "revoked")
+        raise HTTPException(status_code=401, detail="Not Authorized")
+    # 이 워커의 캐시도 DB 기준으로 갱신해 둔다
+    await user_cache.set(user.id, _user_record(user))
+    if not user.admin:
+        raise HTTPException(status_code=403, detail="관리자만 사용할 수 있습니다.")
+    return CurrentUser(id=user.id, username=user.username, admin=True, token_version=user.token_version)
 
 
+async def revoke_tokens(user_id: int, user_repo: UserRepository):
+    await user_repo.bump_token_version(user_id)
+    await user_cache.delete(user_id)
 
 
-def create_JWT(username: str, admin: bool) -> str:
+def create_JWT(username: str, admin: bool, user_id: int, token_version: int) -> str:
     expire = datetime.now(timezone.utc) + timedelta(minutes=float(ACCESS_TOKEN_EXPIRE_MINUTES))
     payload = {
         "sub": username,
+        "uid": user_id,
         "admin": admin,  # 👈 관리자 여부 포함
+        "ver": token_version,  # users.token_version 과 다르면 폐기된 토큰
         "exp": expire
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
-
-
@@ -1,15 +1,32 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Annotated
 import bcrypt
 from fastapi import Depends
 
 from database.orm import User
 from database.repository import UserRepository
+from service.metrics import auth_bcrypt_seconds
+from service.worker_pool import BoundedPool
+from settings import settings
+
+# bcrypt 는 해싱 중 GIL 을 놓기 때문에 스레드 풀로도 충분히 병렬 처리된다
+password_pool = BoundedPool(
+    "bcrypt",
+    lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt"),
+    max_workers=settings.BCRYPT_POOL_SIZE,
+    queue_limit=settings.BCRYPT_QUEUE_LIMIT,
+)
+
 
 class SignBase:
     encoding = "UTF-8"
 
-    def hash_password(self, password: str) -> str:
-        hashed_password = bcrypt.hashpw(password.encode(self.encoding), salt=bcrypt.gensalt())
+    async def hash_password(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+        started_at = time.perf_counter()
+        hashed_password = await password_pool.run(bcrypt.hashpw, password.encode(self.encoding), salt)
+        auth_bcrypt_seconds.observe(time.perf_counter() - started_at, "hash")
         return hashed_password.decode(self.encoding)
 
 
@@ -19,5 +36,23 @@ class SignUpService(SignBase):
 
 
 class SignInService(SignBase):
-    def verify_password(self, plain: str, user_password: str) -> bool:
-        return bcrypt.checkpw(plain.encode(self.encoding), user_password.encode(self.encoding))
+    async def verify_password(self, plain: str, user_password: str) -> bool:
+        started_at = time.perf_counter()
+        matched = await password_pool.run(
+            bcrypt.checkpw, plain.encode(self.encoding), user_password.encode(self.encoding)
+        )
+        auth_bcrypt_seconds.observe(time.perf_counter() - started_at, "verify")
+        return matched
+
+    def needs_rehash(self, user_password: str) -> bool:
+        # "$2b$12$..." 형식에서 cost 를 읽는다
+        try:
+            rounds = int(user_password.split("$")[2])
+        except (IndexError, ValueError):
+            return False
+        return rounds != settings.BCRYPT_ROUNDS
+
+    async def rehash_if_needed(self, user: User, plain: str, user_repo: UserRepository):
+        if settings.BCRYPT_REHASH_ON_LOGIN and self.needs_rehash(user.hashed_password):
+            user.hashed_password = await self.hash_password(plain)
+            await user_repo.save_user(user)
@@ -0,0 +1,72 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+from typing import Callable
+
+from fastapi import HTTPException
+
+from service.metrics import register_worker_pool
+
+
+class BoundedPool:
+    """CPU 를 많이 쓰는 동기 함수를 이벤트 루프 밖에서 실행하고, 대기열이 차면 503 으로 거절한다."""
+
+    def __init__(self, name: str, executor_factory: Callable[[int], Executor], max_workers: int, queue_limit: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.queue_limit = queue_limit
+        self._executor_factory = executor_factory
+        self._executor: Executor | None = None
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        register_worker_pool(self)
+
+    @property
+    def executor(self) -> Executor:
+        # 프로세스 풀은 import 시점에 만들면 안 되므로 처음 쓸 때 생성한다
+        if self._executor is None:
+            self._executor = self._executor_factory(self.max_workers)
+        return self._executor
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        if self.in_flight >= self.max_workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="요청이 많아 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -1,13 +1,122 @@
-from pydantic import BaseSettings
+from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
 
 # 기본은 .env.dev
 env_file = ".env.dev" if os.getenv("ENV") != "prod" else ".env.prod"
 load_dotenv(dotenv_path=env_file)
+load_dotenv()  # database/connection.py 와 동일하게 .env 도 읽는다 (이미 설정된 값은 유지)
 
 class Settings(BaseSettings):
     DATABASE_URL: str
     ENV: str = "dev"  # 기본값 dev
 
+    # DB 커넥션 풀 (SQLite 는 로컬/테스트용이라 기본 풀을 그대로 쓴다)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # 풀이 비었을 때 커넥션을 기다리는 최대 초
+    DB_POOL_RECYCLE: int = 1800  # MySQL wait_timeout 보다 짧게 유지
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int | None = None  # MySQL max_execution_time (SELECT 에만 적용)
+    DB_LOCK_TIMEOUT_SECONDS: int | None = None  # MySQL innodb_lock_wait_timeout
+
+    # 읽기 전용 복제본. 예) DATABASE_REPLICA_URLS='["mysql+aiomysql://...replica1/blog"]'
+    # 로컬에서는 SQLite 파일 두 개와 tools/sqlite_replica.py 로 흉내낼 수 있다
+    DATABASE_REPLICA_URLS: list[str] = []
+    REPLICA_HEALTH_CHECK_INTERVAL: float = 5  # 이 주기마다 SELECT 1 로 확인
+    REPLICA_RETRY_AFTER: float = 30  # 장애로 판단한 복제본을 다시 시도하기까지의 초
+    # 쓰기에 성공한 사용자의 읽기를 이 시간(초) 동안 primary 로 보낸다. 복제 지연보다 길게 잡는다
+    REPLICA_READ_YOUR_WRITES_SECONDS: float = 5
+
+    # /internal/* 호출 시 X-Internal-Token 헤더로 확인. 비어 있으면 prod 가 아닐 때만 허용
+    INTERNAL_TOKEN: str | None = None
+
+    # 읽기 캐시: memory(프로세스 내 LRU/TTL) | redis(여러 워커가 공유) | none
+    CACHE_BACKEND: str = "memory"
+    CACHE_TTL_SECONDS: float = 30
+    CACHE_MAX_ENTRIES: int = 10_000
+    REDIS_URL: str | None = None
+
+    # bcrypt 는 이벤트 루프를 막지 않도록 전용 스레드 풀에서 실행한다
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_POOL_SIZE: int = 4
+    BCRYPT_QUEUE_LIMIT: int = 64  # 이 이상 대기하면 503
+    BCRYPT_REHASH_ON_LOGIN: bool = True  # 저장된 해시의 cost 가 BCRYPT_ROUNDS 와 다르면 로그인 시 재해싱
+
+    # True 면 JWT 의 uid 클레임을 믿고, users 조회는 토큰 버전/권한 확인용 TTL 캐시로 대신한다.
+    # 관리자 전용 라우트(require_admin)는 이 설정과 상관없이 DB 에서 권한과 토큰 버전을 다시 확인한다
+    JWT_TRUST_CLAIMS: bool = True
+    # 일반 라우트에서 토큰 폐기/권한 변경은 다른 워커에 최대 이 시간만큼 늦게 반영된다
+    AUTH_USER_CACHE_TTL_SECONDS: float = 60
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 10_000
+
+    # 업로드 저장소: cloudinary | local(static/uploads) | memory(테스트용)
+    STORAGE_BACKEND: str = "cloudinary"
+    UPLOAD_MAX_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_ALLOWED_TYPES: list[str] = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024
+
+    # 업로드 이미지 변환 (Pillow 필요). 프로세스 풀에서 크기별/포맷별 사본을 만든다
+    IMAGE_PROCESSING_ENABLED: bool = True
+    IMAGE_VARIANT_WIDTHS: dict[str, int] = {"thumb": 320, "medium": 960, "large": 1920}
+    IMAGE_FORMATS: list[str] = ["avif", "webp", "jpeg"]  # Pillow 빌드가 지원하지 않는 포맷은 건너뜀
+    IMAGE_QUALITY: int = 80
+    IMAGE_POOL_SIZE: int = 2
+    IMAGE_QUEUE_LIMIT: int = 16
+    IMAGE_UPLOAD_CONCURRENCY: int = 4  # 원본과 변환본을 저장소에 동시에 올리는 최대 수
+
+    # 검색: auto 면 MySQL 은 FULLTEXT, 그 외(SQLite 테스트 등)는 프로세스 내 역색인 사용.
+    # 역색인은 워커마다 따로 만들고 그 워커의 쓰기만 반영하므로 단일 워커(개발/테스트) 전용이다
+    SEARCH_BACKEND: str = "auto"  # auto | fulltext | memory
+    # uvicorn/gunicorn 이 읽는 워커 수. 1 보다 크면 역색인 검색으로는 시작하지 않는다
+    WEB_CONCURRENCY: int = 1
+
+    # 댓글 목록: 답글은 이 깊이까지만 미리 읽고(깊이마다 쿼리 1번), 부모마다 앞의 몇 개만 싣는다
+    # 나머지는 GET /comment/{comment_id}/replies 로 이어서 읽는다
+    COMMENT_REPLY_DEPTH: int = 2
+    COMMENT_REPLY_PREVIEW: int = 3
+
+    # 응답 압축: Accept-Encoding 에 따라 br(brotli 패키지가 있을 때)/gzip. 이 크기 미만은 압축하지 않는다
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1(빠름) ~ 9(작음)
+    COMPRESSION_BROTLI_QUALITY: int = 4  # 0 ~ 11. 매 요청 압축이라 낮게 둔다 (미리 압축하는 정적 파일은 11)
+    STATIC_CACHE_SECONDS: int = 3600  # /static 의 Cache-Control max-age (uploads/ 는 1년 immutable)
+
+    # SQL 계측: 이 시간(ms)을 넘긴 쿼리는 엔드포인트와 함께 경고 로그를 남긴다
+    SLOW_QUERY_MS: float = 200
+
+    # 요청 한도: "METHOD 경로" 별 토큰 버킷 ("횟수/second|minute|hour|day"). 로그인 사용자는 사용자별, 아니면 IP 별
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # memory(워커별) | redis(REDIS_URL, 워커 공유)
+    RATE_LIMIT_ROUTES: dict[str, str] = {
+        "POST /user/sign-in": "10/minute",
+        "POST /user/sign-up": "5/minute",
+        "POST /posts/upload/image": "20/minute",
+        "GET /posts/": "120/minute",
+    }
+    RATE_LIMIT_DEFAULT: str | None = None  # 위에 없는 경로에 적용할 한도. 비우면 제한하지 않는다
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # memory 백엔드가 기억하는 버킷 수
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # 프록시 뒤라면 X-Forwarded-For 의 첫 주소를 IP 로 쓴다
+    # 부하 차단: 처리 중인 요청이나 커넥션 대기 요청이 이만큼 쌓이면 바로 503 (0 이면 끔)
+    SHED_MAX_IN_FLIGHT: int = 256
+    SHED_MAX_POOL_WAITERS: int = 32
+    SHED_RETRY_AFTER: int = 1
+
+    # 관리자 일괄 작업: 한 요청의 최대 id 수와, IN (...) 목록을 나눠 보낼 크기 (모두 한 트랜잭션)
+    ADMIN_BULK_MAX_IDS: int = 10_000
+    ADMIN_BULK_CHUNK_SIZE: int = 500
+
+    # 쓰기 후처리(캐시 무효화, 검색 색인, 정적 파일 사전 압축)는 응답 뒤 백그라운드 작업으로 실행한다
+    JOBS_CONCURRENCY: int = 4
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_SECONDS: float = 0.5  # 재시도마다 두 배씩 늘어난다 (지터 포함)
+    JOBS_RETRY_MAX_SECONDS: float = 60
+    JOBS_DRAIN_TIMEOUT: float = 10  # 종료 시 남은 작업을 기다리는 최대 초
+    # True 면 작업을 쓰기와 같은 트랜잭션으로 jobs 테이블에 기록해 재시작 후에도 실행한다
+    JOBS_DURABLE: bool = False
+
+    # 시작할 때 커넥션 풀을 채우고 쿼리/bcrypt/JWT 를 한 번씩 실행해 배포 직후 첫 요청들이 그 비용을 치르지 않게 한다
+    STARTUP_WARMUP: bool = True
+
 settings = Settings()
@@ -0,0 +1,181 @@
+"""리포지토리 쿼리마다 실행 계획(EXPLAIN)을 보고 인덱스를 타지 않는 전체 스캔을 찾아낸다.
+
+    cd src && python -m benchmarks.seed --create-tables   # 계획이 실제와 비슷하도록 데이터를 먼저 채운다
+    cd src && python -m tools.index_advisor [--verbose]
+
+리포지토리의 읽기 메서드를 한 번씩 실행하며 나간 SQL 을 모아 같은 파라미터로 EXPLAIN 하고,
+FK 마다 ON DELETE CASCADE 가 자식 테이블을 찾는 조회(WHERE fk = ?)도 함께 본다.
+SQLite(EXPLAIN QUERY PLAN)와 MySQL(EXPLAIN)을 지원한다. 전체 스캔이 있으면 종료 코드 1.
+"""
+import argparse
+import asyncio
+import re
+import sys
+
+from sqlalchemy import event, func, select
+
+from database.connection import AsyncSessionLocal, engine
+from database.orm import Base, Post, Comment, User
+from database.repository import PostRepository, CommentRepository, UserRepository
+from schema.response import EXCERPT_LENGTH
+
+SQLITE_FULL_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+def _sqlite_findings(plan) -> tuple[list[str], list[str]]:
+    scans, warnings = [], []
+    for row in plan:
+        detail = row[-1]
+        full_scan = SQLITE_FULL_SCAN.match(detail)
+        # "SCAN posts USING INDEX ..." 는 인덱스 순서대로 읽다가 LIMIT 에서 멈추므로 전체 스캔으로 보지 않는다.
+        # 서브쿼리 결과(anon_1 등)를 훑는 것도 테이블 스캔이 아니다
+        if full_scan and full_scan.group(1) in Base.metadata.tables:
+            scans.append(detail)
+        elif "USE TEMP B-TREE" in detail:
+            warnings.append(detail)
+    return scans, warnings
+
+
+def _mysql_findings(plan) -> tuple[list[str], list[str]]:
+    scans, warnings = [], []
+    for row in plan:
+        row = row._mapping
+        if row["type"] == "ALL":
+            scans.append(f"{row['table']}: type=ALL rows={row['rows']}")
+        extra = row.get("Extra") or ""
+        if "Using filesort" in extra or "Using temporary" in extra:
+            warnings.append(f"{row['table']}: {extra}")
+    return scans, warnings
+
+
+class QueryRecorder:
+    """engine 에서 실행되는 SQL 과 파라미터를 이름 붙여 모은다."""
+
+    def __init__(self):
+        self.name: str | None = None
+        self.queries: list[tuple[str, str, tuple]] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.name is not None and statement.lstrip().upper().startswith("SELECT"):
+            self.queries.append((self.name, statement, tuple(parameters or ())))
+
+
+async def _sample_ids(session) -> dict:
+    # 댓글이 가장 많은 글과 답글이 가장 많은 댓글을 골라 실제 데이터가 있는 경로를 태운다
+    post_id = await session.scalar(
+        select(Comment.post_id).group_by(Comment.post_id).order_by(func.count().desc()).limit(1)
+    ) or await session.scalar(select(func.max(Post.id)))
+    parent_id = await session.scalar(
+        select(Comment.parent_id).where(Comment.parent_id.is_not(None))
+        .group_by(Comment.parent_id).order_by(func.count().desc()).limit(1)
+    ) or await session.scalar(select(func.max(Comment.id)))
+    user = await session.scalar(select(User).limit(1))
+    if post_id is None or user is None:
+        raise SystemExit("데이터가 없습니다. python -m benchmarks.seed 를 먼저 실행하세요.")
+    created_at = await session.scalar(select(Post.created_at).where(Post.id == post_id))
+    return {"post_id": post_id, "comment_id": parent_id, "user_id": user.id, "username": user.username,
+            "created_at": created_at}
+
+
+def repository_cases(session, ids: dict, limit: int) -> dict:
+    posts = PostRepository(session)
+    comments = CommentRepository(session)
+    users = UserRepository(session)
+
+    async def threads():
+        rows, _ = await comments.get_comments_by_post_id(ids["post_id"], None, limit)
+        await comments._build_threads(rows)
+
+    async def reply_threads():
+        rows, _ = await comments.get_replies_by_parent_id(ids["comment_id"], None, limit)
+        await comments._build_threads(rows)
+
+    return {
+        "PostRepository.get_posts": lambda: posts.get_posts(None, limit),
+        "PostRepository.get_posts(cursor)": lambda: posts.get_posts((False, ids["post_id"]), limit),
+        "PostRepository.get_posts_version": lambda: posts.get_posts_version(None, limit),
+        "PostRepository.get_post_summaries": lambda: posts.get_post_summaries(None, limit, EXCERPT_LENGTH),
+        "PostRepository.get_posts_by_time": lambda: posts.get_posts_by_time(
+            since=ids["created_at"], after=(ids["created_at"], ids["post_id"]), limit=limit),
+        "PostRepository.get_posts_by_time(user)": lambda: posts.get_posts_by_time(
+            since=ids["created_at"], user_id=ids["user_id"], limit=limit),
+        "PostRepository.get_post_by_id": lambda: posts.get_post_by_id(ids["post_id"]),
+        "PostRepository.get_post_version": lambda: posts.get_post_version(ids["post_id"]),
+        "PostRepository.search_posts": lambda: posts.search_posts("데이터베이스", 0, limit),
+        "CommentRepository.get_comments_by_post_id+threads": threads,
+        "CommentRepository.get_replies_by_parent_id+threads": reply_threads,
+        "CommentRepository.get_comments_version": lambda: comments.get_comments_version(ids["post_id"]),
+        "CommentRepository.get_comment_by_comment_id": lambda: comments.get_comment_by_comment_id(ids["comment_id"]),
+        "CommentRepository.get_comment_post_id": lambda: comments.get_comment_post_id(ids["comment_id"]),
+        "UserRepository.get_user_by_username": lambda: users.get_user_by_username(ids["username"]),
+        "UserRepository.get_user_by_id": lambda: users.get_user_by_id(ids["user_id"]),
+    }
+
+
+def cascade_queries(sample_id: int) -> list[tuple[str, str, tuple]]:
+    # 부모 행을 지울 때 DB 가 하는 자식 조회. 인덱스가 없으면 부모 한 행마다 자식 테이블 전체를 훑는다
+    queries = []
+    for table in Base.metadata.sorted_tables:
+        for fk in table.foreign_keys:
+            column = fk.parent
+            queries.append((
+                f"cascade {fk.column.table.name} → {table.name}.{column.name}",
+                f"SELECT 1 FROM {table.name} WHERE {column.name} = ?",
+                (sample_id,),
+            ))
+    return queries
+
+
+async def explain(conn, dialect: str, statement: str, parameters: tuple):
+    if dialect == "sqlite":
+        result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+        return result.all(), _sqlite_findings
+    statement = statement.replace("?", "%s")
+    result = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+    return result.all(), _mysql_findings
+
+
+async def main(limit: int, verbose: bool) -> int:
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "mysql"):
+        raise SystemExit(f"지원하지 않는 DB 입니다: {dialect}")
+
+    recorder = QueryRecorder()
+    event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    async with AsyncSessionLocal() as session:
+        ids = await _sample_ids(session)
+        # 프로세스 내 역색인 적재(첫 검색 때 한 번 하는 전체 읽기)는 요청마다 하는 쿼리가 아니므로 빼고 본다
+        await PostRepository(session).search_posts("warmup", 0, 1)
+        for name, case in repository_cases(session, ids, limit).items():
+            recorder.name = name
+            await case()
+        recorder.name = None
+    event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+
+    queries = recorder.queries + cascade_queries(ids["post_id"])
+    full_scans = 0
+    async with engine.connect() as conn:
+        for name, statement, parameters in queries:
+            plan, findings = await explain(conn, dialect, statement, parameters)
+            scans, warnings = findings(plan)
+            full_scans += len(scans)
+            status = "FULL SCAN" if scans else ("warn" if warnings else "ok")
+            print(f"[{status:>9}] {name}")
+            for line in scans + warnings:
+                print(f"             {line}")
+            if verbose:
+                print("             " + " ".join(statement.split()))
+                for row in plan:
+                    print(f"               {tuple(row)}")
+
+    await engine.dispose()
+    print(f"\n쿼리 {len(queries)}개, 전체 스캔 {full_scans}건")
+    return 1 if full_scans else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=20, help="목록 쿼리의 페이지 크기")
+    parser.add_argument("--verbose", action="store_true", help="SQL 과 전체 실행 계획도 출력")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.limit, args.verbose)))
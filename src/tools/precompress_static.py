@@ -0,0 +1,41 @@
+"""static/ 아래 텍스트 계열 파일(css, js, svg, html, json 등) 옆에 .br/.gz 를 미리 만든다.
+
+    cd src && python -m tools.precompress_static [--directory ../static] [--force]
+
+배포(빌드) 때 한 번 실행해 두면 PrecompressedStaticFiles 가 요청마다 압축하지 않고 그대로 보낸다.
+brotli 패키지가 없으면 .gz 만 만든다.
+"""
+import argparse
+import mimetypes
+import os
+
+from service.compression import SUFFIXES, is_compressible, precompress_file
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "static")
+
+
+def _is_stale(path: str) -> bool:
+    source_mtime = os.path.getmtime(path)
+    siblings = [path + suffix for suffix in SUFFIXES.values() if os.path.exists(path + suffix)]
+    return not siblings or any(os.path.getmtime(sibling) < source_mtime for sibling in siblings)
+
+
+def main(directory: str, force: bool):
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.endswith(tuple(SUFFIXES.values())) or name.endswith(".part"):
+                continue
+            path = os.path.join(root, name)
+            content_type, _ = mimetypes.guess_type(path)
+            if is_compressible(content_type) and (force or _is_stale(path)):
+                written += len(precompress_file(path))
+    print(f"미리 압축 완료: {written}개 파일 생성")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--directory", default=STATIC_DIR)
+    parser.add_argument("--force", action="store_true", help="이미 있는 .br/.gz 도 다시 만든다")
+    args = parser.parse_args()
+    main(args.directory, args.force)
@@ -0,0 +1,42 @@
+"""posts.comment_count 를 comments 테이블 기준으로 다시 맞춘다.
+
+    cd src && python -m tools.reconcile_comment_counts [--batch-size 10000]
+
+고친 글은 updated_at 이 바뀌므로 글 상세/목록/댓글 응답은 API 워커에서도 버전이 달라져 바로 다시 읽힌다.
+버전 확인이 없는 요약 목록(/posts/summary) 캐시는 CACHE_BACKEND=redis 면 여기서 비우고,
+memory 면 워커마다 따로라 이 프로세스에서 비울 수 없으므로 CACHE_TTL_SECONDS 뒤에 반영된다.
+"""
+import argparse
+import asyncio
+
+from database.connection import AsyncSessionLocal, engine
+from database.repository import PostRepository, FEED_PREFIX
+from service.cache import cache
+from settings import settings
+
+
+async def main(batch_size: int):
+    async with AsyncSessionLocal() as session:
+        repaired = await PostRepository(session).reconcile_comment_counts(batch_size)
+    await engine.dispose()
+    print(f"comment_count 재계산 완료: {repaired}개 글 수정")
+    if not repaired:
+        return
+
+    if settings.CACHE_BACKEND == "redis":
+        # 모든 워커가 같은 Redis 를 보므로 여기서 비우면 바로 반영된다
+        await cache.invalidate_prefix("post:")
+        await cache.invalidate_prefix(FEED_PREFIX)
+        print("공유 캐시(redis)의 글/목록 캐시를 비웠습니다.")
+    elif settings.CACHE_BACKEND == "memory":
+        print(
+            f"CACHE_BACKEND=memory: API 워커의 요약 목록 캐시는 최대 {settings.CACHE_TTL_SECONDS:g}초 뒤에 반영됩니다. "
+            "바로 반영하려면 워커를 재시작하세요."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
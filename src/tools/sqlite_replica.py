@@ -0,0 +1,35 @@
+"""로컬에서 읽기 복제본을 흉내낸다: primary SQLite 파일을 주기적으로 replica 파일에 복사한다.
+
+    DATABASE_URL=sqlite+aiosqlite:///./primary.db
+    DATABASE_REPLICA_URLS='["sqlite+aiosqlite:///./replica.db"]'
+
+    cd src && python -m tools.sqlite_replica ./primary.db ./replica.db --lag 2
+
+복사 주기(--lag)만큼 복제 지연이 생기고, 이 프로세스를 멈추거나 replica 파일을 지우면
+복제본 장애와 primary 로의 전환을 확인할 수 있다.
+"""
+import argparse
+import sqlite3
+import time
+
+
+def copy_once(primary_path: str, replica_path: str):
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("primary")
+    parser.add_argument("replica")
+    parser.add_argument("--lag", type=float, default=2.0, help="복사 주기(초)")
+    args = parser.parse_args()
+
+    while True:
+        copy_once(args.primary, args.replica)
+        time.sleep(args.lag)
@@ -0,0 +1,93 @@
+import os
+import sys
+import tempfile
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+# 앱 모듈은 src 기준으로 import 하고, 설정은 import 전에 환경 변수로 정해 둔다
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+_db_dir = tempfile.mkdtemp(prefix="blog-test-")
+os.environ.update(
+    DATABASE_URL=f"sqlite+aiosqlite:///{_db_dir}/test.sqlite",
+    SECRET_KEY="test-secret",
+    ALGORITHM="HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES="30",
+    STORAGE_BACKEND="memory",
+    RATE_LIMIT_ENABLED="false",
+    CACHE_BACKEND="memory",
+)
+
+import main  # noqa: E402
+from database.connection import engine  # noqa: E402
+from database.orm import Base  # noqa: E402
+from service.metrics import db_query_budget_exceeded  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+async def app():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield main.app
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+def _budget_exceeded() -> dict:
+    return {labels: value for _, labels, value in db_query_budget_exceeded.samples()}
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budget():
+    """query_budget 으로 선언한 쿼리 수를 넘긴 요청이 있으면 그 테스트를 실패시킨다.
+
+    운영에서는 응답을 바꾸지 않고 로그와 메트릭에만 남긴다.
+    """
+    before = _budget_exceeded()
+    yield
+    exceeded = {labels: value - before.get(labels, 0) for labels, value in _budget_exceeded().items()
+                if value > before.get(labels, 0)}
+    assert not exceeded, f"쿼리 예산을 넘긴 라우트: {exceeded}"
+
+
+@pytest.fixture
+def statements():
+    """primary 엔진에서 실행된 SQL 과 커밋("COMMIT")을 순서대로 모은다."""
+    executed = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(" ".join(statement.split()))
+
+    def on_commit(conn):
+        executed.append("COMMIT")
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(engine.sync_engine, "commit", on_commit)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+    event.remove(engine.sync_engine, "commit", on_commit)
+
+
+@pytest.fixture
+def sign_up(client):
+    """가입 후 로그인해 Authorization 헤더를 돌려주는 함수."""
+    async def sign_up(username: str) -> dict:
+        body = {"username": username, "password": "pass1234"}
+        response = await client.post("/user/sign-up", json=body)
+        assert response.status_code == 200, response.text
+        response = await client.post("/user/sign-in", json=body)
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['token']}"}
+
+    return sign_up
@@ -0,0 +1,39 @@
+"""관리자 권한은 캐시가 아니라 DB 로 판단한다 (다른 워커에서 바뀐 권한도 바로 반영)."""
+import pytest
+from sqlalchemy import update
+
+from database.connection import engine
+from database.orm import User
+
+pytestmark = pytest.mark.anyio
+
+
+async def set_admin(username: str, admin: bool):
+    # 다른 워커에서 바뀐 것처럼 이 워커의 user_cache 는 건드리지 않고 DB 만 바꾼다
+    async with engine.begin() as conn:
+        await conn.execute(update(User).where(User.username == username).values(admin=admin))
+
+
+async def pin_all(client, headers):
+    return await client.patch("/admin/posts/pin", json={"ids": [0], "is_pinned": True}, headers=headers)
+
+
+async def test_promoted_user_gets_admin_routes_immediately(client, sign_up):
+    headers = await sign_up("promoted_admin")
+    # 일반 사용자로 캐시에 올라간 상태
+    assert (await pin_all(client, headers)).status_code == 403
+
+    await set_admin("promoted_admin", True)
+
+    response = await pin_all(client, headers)
+    assert response.status_code == 200, response.text
+
+
+async def test_demoted_user_loses_admin_routes_immediately(client, sign_up):
+    headers = await sign_up("demoted_admin")
+    await set_admin("demoted_admin", True)
+    assert (await pin_all(client, headers)).status_code == 200
+
+    await set_admin("demoted_admin", False)
+
+    assert (await pin_all(client, headers)).status_code == 403
@@ -0,0 +1,35 @@
+"""응답 압축."""
+import httpx
+import pytest
+from starlette.staticfiles import StaticFiles
+
+from service.compression import CompressionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+TEXT = ("".join(f"line {i}\n" for i in range(2000))).encode()
+
+
+@pytest.fixture
+async def static_client(tmp_path):
+    (tmp_path / "notes.txt").write_bytes(TEXT)
+    app = CompressionMiddleware(StaticFiles(directory=tmp_path))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def test_full_response_is_compressed(static_client):
+    response = await static_client.get("/notes.txt", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == TEXT
+
+
+async def test_range_response_is_not_compressed(static_client):
+    response = await static_client.get("/notes.txt", headers={"Accept-Encoding": "gzip", "Range": "bytes=100-9999"})
+
+    assert response.status_code == 206
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"] == f"bytes 100-9999/{len(TEXT)}"
+    assert response.content == TEXT[100:10000]
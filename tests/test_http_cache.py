@@ -0,0 +1,39 @@
+"""조건부 요청 (ETag / Last-Modified)."""
+from datetime import datetime
+
+from fastapi import Response
+from starlette.requests import Request
+
+from service.http_cache import not_modified_response
+
+ETAG = 'W/"version"'
+
+
+def conditional(last_modified: datetime, **headers) -> Response | None:
+    scope = {
+        "type": "http", "method": "GET", "path": "/",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    }
+    return not_modified_response(Request(scope), Response(), ETAG, last_modified)
+
+
+def test_if_modified_since_same_second_edit_is_modified():
+    # 12:00:00.100 에 받아 가 Last-Modified 12:00:00 을 가진 클라이언트. 글은 12:00:00.900 에 고쳐졌다
+    response = conditional(datetime(2026, 1, 1, 12, 0, 0, 900_000), if_modified_since="Thu, 01 Jan 2026 12:00:00 GMT")
+
+    assert response is None
+
+
+def test_if_modified_since_unchanged():
+    response = conditional(datetime(2026, 1, 1, 11, 59, 59, 500_000), if_modified_since="Thu, 01 Jan 2026 12:00:00 GMT")
+    assert response is not None and response.status_code == 304
+
+    response = conditional(datetime(2026, 1, 1, 12, 0, 0), if_modified_since="Thu, 01 Jan 2026 12:00:00 GMT")
+    assert response is not None and response.status_code == 304
+
+
+def test_if_none_match_takes_precedence():
+    response = conditional(datetime(2026, 1, 1, 12, 0, 0), if_none_match='"other"', if_modified_since="Thu, 01 Jan 2026 12:00:00 GMT")
+    assert response is None
+    response = conditional(datetime(2026, 1, 1, 12, 0, 0), if_none_match=ETAG)
+    assert response is not None and response.status_code == 304
@@ -0,0 +1,21 @@
+"""읽기 라우트가 선언한 쿼리 예산 안에서 끝나는지 확인한다 (예산 검사는 conftest 의 enforce_query_budget)."""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_read_routes_stay_within_budget(client, sign_up):
+    headers = await sign_up("budget_reader")
+    response = await client.post("/posts/", json={"title": "title", "content": "content"}, headers=headers)
+    post_id = response.json()["id"]
+    response = await client.post(f"/comment/{post_id}", json={"content": "comment"}, headers=headers)
+    comment_id = response.json()["id"]
+    await client.post(f"/comment/{post_id}", json={"content": "reply", "parent_id": comment_id}, headers=headers)
+
+    for path in ("/posts/", "/posts/summary", f"/posts/{post_id}", f"/comment/post/{post_id}",
+                 f"/comment/{comment_id}/replies"):
+        # 두 번째 요청은 캐시를 거친다
+        for _ in range(2):
+            response = await client.get(path, headers=headers)
+            assert response.status_code == 200, (path, response.text)
+
@@ -0,0 +1,102 @@
+"""쓰기 요청이 쓰기 SQL 한 문장과 커밋 한 번으로 끝나는지 확인한다 (쓰기 뒤에 다시 SELECT 하지 않는다).
+
+댓글 추가/삭제는 같은 트랜잭션에서 posts.comment_count 도 갱신하므로 그 UPDATE 하나만 더 허용한다.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+DML = ("INSERT", "UPDATE", "DELETE")
+
+
+def assert_single_write(statements: list[str], *expected: str):
+    # 소유자 확인처럼 쓰기 전에 하는 조회는 빼고, 첫 쓰기 문장부터 커밋까지를 본다
+    first = next((i for i, statement in enumerate(statements) if statement.startswith(DML)), len(statements))
+    executed = statements[first:]
+    assert len(executed) == len(expected) + 1, executed
+    for statement, prefix in zip(executed, expected):
+        assert statement.startswith(prefix), executed
+    assert executed[-1] == "COMMIT", executed
+
+
+async def create_post(client, headers) -> int:
+    response = await client.post("/posts/", json={"title": "title", "content": "content"}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+async def create_comment(client, headers, post_id: int) -> int:
+    response = await client.post(f"/comment/{post_id}", json={"content": "comment"}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+async def test_create_post(client, sign_up, statements):
+    headers = await sign_up("post_creator")
+    statements.clear()
+
+    response = await client.post("/posts/", json={"title": "title", "content": "content"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["username"] == "post_creator"
+    assert_single_write(statements, "INSERT INTO posts")
+
+
+async def test_update_post(client, sign_up, statements):
+    headers = await sign_up("post_editor")
+    post_id = await create_post(client, headers)
+    statements.clear()
+
+    response = await client.put(f"/posts/{post_id}", json={"title": "edited", "content": "edited"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "edited"
+    assert response.json()["username"] == "post_editor"
+    assert_single_write(statements, "UPDATE posts")
+
+
+async def test_delete_post(client, sign_up, statements):
+    headers = await sign_up("post_remover")
+    post_id = await create_post(client, headers)
+    statements.clear()
+
+    response = await client.delete(f"/posts/{post_id}", headers=headers)
+
+    assert response.status_code == 204, response.text
+    assert_single_write(statements, "DELETE FROM posts")
+
+
+async def test_create_comment(client, sign_up, statements):
+    headers = await sign_up("comment_creator")
+    post_id = await create_post(client, headers)
+    statements.clear()
+
+    response = await client.post(f"/comment/{post_id}", json={"content": "comment"}, headers=headers)
+
+    assert response.status_code == 201, response.text
+    assert response.json()["username"] == "comment_creator"
+    assert_single_write(statements, "UPDATE posts SET updated_at=?, comment_count=", "INSERT INTO comments")
+
+
+async def test_update_comment(client, sign_up, statements):
+    headers = await sign_up("comment_editor")
+    comment_id = await create_comment(client, headers, await create_post(client, headers))
+    statements.clear()
+
+    response = await client.put(f"/comment/{comment_id}", json={"content": "edited"}, headers=headers)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["content"] == "edited"
+    assert response.json()["username"] == "comment_editor"
+    assert_single_write(statements, "UPDATE comments")
+
+
+async def test_delete_comment(client, sign_up, statements):
+    headers = await sign_up("comment_remover")
+    comment_id = await create_comment(client, headers, await create_post(client, headers))
+    statements.clear()
+
+    response = await client.delete(f"/comment/{comment_id}", headers=headers)
+
+    assert response.status_code == 204, response.text
+    assert_single_write(statements, "DELETE FROM comments", "UPDATE posts SET updated_at=?, comment_count=")
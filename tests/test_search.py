@@ -0,0 +1,14 @@
+"""검색 결과 하이라이트."""
+import pytest
+
+from service.search import highlight
+
+
+@pytest.mark.parametrize("term", ["amp", "lt", "gt", "quot"])
+def test_highlight_does_not_match_inside_entities(term):
+    assert highlight('Tom & Jerry <3> "cartoon"', [term]) == "Tom &amp; Jerry &lt;3&gt; &quot;cartoon&quot;"
+
+
+def test_highlight_escapes_matches_and_surrounding_text():
+    assert highlight("a <b> & <B>", ["<b>"]) == "a <mark>&lt;b&gt;</mark> &amp; <mark>&lt;B&gt;</mark>"
+    assert highlight("FastAPI & SQL", ["fastapi", "sql"]) == "<mark>FastAPI</mark> &amp; <mark>SQL</mark>"
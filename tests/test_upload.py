@@ -0,0 +1,106 @@
+"""이미지 업로드: 받는 도중 거르기, 변환본 저장."""
+import io
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+BOUNDARY = "test-boundary"
+CHUNK = 64 * 1024
+
+
+def png_bytes(width: int = 8, height: int = 8) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class MultipartBody:
+    """파일 파트 하나를 CHUNK 단위로 보내며 몇 조각을 읽어 갔는지 센다."""
+
+    def __init__(self, content_type: str, data: bytes):
+        head = (
+            f"--{BOUNDARY}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="upload.png"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode()
+        self.body = head + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+        self.sent = 0
+
+    @property
+    def chunks(self) -> int:
+        return -(-len(self.body) // CHUNK)
+
+    async def __aiter__(self):
+        for start in range(0, len(self.body), CHUNK):
+            self.sent += 1
+            yield self.body[start:start + CHUNK]
+
+
+async def upload(client, body: MultipartBody):
+    return await client.post(
+        "/posts/upload/image", content=body,
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+
+
+async def test_disallowed_type_is_rejected_while_receiving(client):
+    body = MultipartBody("application/pdf", b"%PDF-1.7" + b"\0" * (2 * 1024 * 1024))
+
+    response = await upload(client, body)
+
+    assert response.status_code == 415, response.text
+    assert body.sent < body.chunks
+
+
+async def test_mismatched_bytes_are_rejected_while_receiving(client):
+    body = MultipartBody("image/png", b"GIF89a" + b"\0" * (2 * 1024 * 1024))
+
+    response = await upload(client, body)
+
+    assert response.status_code == 415, response.text
+    assert body.sent < body.chunks
+
+
+async def test_allowed_image_is_uploaded(client):
+    body = MultipartBody("image/png", png_bytes())
+
+    response = await upload(client, body)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["url"].startswith("memory://")
+
+
+async def test_widths_larger_than_the_image_share_one_variant(client):
+    from service.file import storage
+
+    before = set(storage.files)
+    response = await upload(client, MultipartBody("image/png", png_bytes()))
+
+    assert response.status_code == 200, response.text
+    variants = response.json()["variants"]
+    # 8px 이미지는 모든 크기에서 원본 크기이므로 한 벌만 저장하고 이름은 모두 그 파일을 가리킨다
+    assert len({tuple(sorted(variant.items())) for variant in variants.values()}) == 1
+    formats = [key for key in next(iter(variants.values())) if key not in ("width", "height")]
+    assert len(set(storage.files) - before) == 1 + len(formats)
+
+
+async def test_failed_variant_upload_removes_uploaded_files(client, monkeypatch):
+    from service.file import storage
+
+    save_bytes = storage.save_bytes
+
+    async def failing_save_bytes(name, data, content_type):
+        if name.endswith(".jpeg"):
+            raise RuntimeError("storage unavailable")
+        return await save_bytes(name, data, content_type)
+
+    monkeypatch.setattr(storage, "save_bytes", failing_save_bytes)
+    before = set(storage.files)
+
+    response = await upload(client, MultipartBody("image/png", png_bytes()))
+
+    assert response.status_code == 500, response.text
+    assert set(storage.files) == before
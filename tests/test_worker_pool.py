@@ -0,0 +1,25 @@
+"""BoundedPool 집계."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from service.worker_pool import BoundedPool
+
+pytestmark = pytest.mark.anyio
+
+
+def fail():
+    raise ValueError("bad hash")
+
+
+async def test_failed_calls_are_not_counted_as_completed():
+    pool = BoundedPool("test", lambda workers: ThreadPoolExecutor(max_workers=workers), max_workers=1, queue_limit=1)
+    try:
+        assert await pool.run(sum, [1, 2]) == 3
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+    finally:
+        pool.shutdown()
+
+    stats = pool.stats()
+    assert (stats["completed"], stats["failed"], stats["in_flight"]) == (1, 1, 0)